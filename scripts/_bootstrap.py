@@ -0,0 +1,23 @@
+"""
+Shared path setup for the CLI scripts in this directory.
+
+Scripts are run as files (``python scripts/x.py``), so this module is importable
+via the script directory on ``sys.path[0]``. Every script puts ``ROOT`` on the
+path and imports project code as ``src.*``; the pipeline drivers run stages in
+one process, and mixing in ``utils.*`` imports would load a second copy of each
+module (and of the config it holds).
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = ROOT / "scripts"
+
+
+def ensure_on_path(*paths: Path) -> None:
+    """Prepend ``paths`` to ``sys.path`` unless already present."""
+    for path in paths:
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
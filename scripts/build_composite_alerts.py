@@ -1,21 +1,36 @@
-from pathlib import Path
-import sys
+import argparse
 import logging
 
-ROOT = Path(__file__).resolve().parents[1]
-SRC = ROOT / "src"
-if str(SRC) not in sys.path:
-    sys.path.insert(0, str(SRC))
+from _bootstrap import ROOT, ensure_on_path
 
-from analysis.composite_alerts import OUT_DEBUG, OUT_MERGED, OUT_RAW, run
-from utils.config_loader import CFG
-from utils.logging_utils import setup_logging_from_cfg
+ensure_on_path(ROOT)
 
-if __name__ == "__main__":
-    setup_logging_from_cfg(CFG, app_name="build_composite_alerts")
+from src.utils.config_loader import CFG
+from src.utils.logging_utils import setup_logging_from_cfg
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build composite alerts (stages 02-05)")
+    parser.add_argument(
+        "--mode",
+        choices=("run", "debug"),
+        default="run",
+        help="debug forces DEBUG logging, including exception tracebacks",
+    )
+    return parser.parse_args()
+
+
+def main(frames: dict | None = None) -> None:
+    args = parse_args()
+    cfg = CFG
+    if args.mode == "debug":
+        cfg = {**CFG, "logging": {**CFG.get("logging", {}), "level": "DEBUG"}}
+    setup_logging_from_cfg(cfg, app_name="build_composite_alerts")
     logger = logging.getLogger(__name__)
     try:
-        out = run()
+        from src.analysis.composite_alerts import OUT_DEBUG, OUT_MERGED, OUT_RAW, run
+
+        out = run(frames=frames)
         logger.info("Composite alerts saved to %s", out)
         logger.info("Raw alerts saved to %s", OUT_RAW)
         logger.info("Merged events saved to %s", OUT_MERGED)
@@ -28,3 +43,7 @@ if __name__ == "__main__":
         logger.error("Composite alerts failed: %s", exc)
         logger.debug("Composite alerts exception detail", exc_info=exc)
         raise SystemExit(1) from None
+
+
+if __name__ == "__main__":
+    main()
@@ -15,14 +15,12 @@ You can adjust the cloud filtering threshold and whether indices are
 interpolated by modifying the default arguments in the call below.
 """
 
-import sys
 import logging
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
+from _bootstrap import ROOT, ensure_on_path
+
+ensure_on_path(ROOT)
 
-from src.transform.merge_data import merge_weather_ndvi
 from src.utils.config_loader import CFG, MERGED_CSV
 from src.utils.logging_utils import setup_logging_from_cfg
 
@@ -31,6 +29,8 @@ def main() -> None:
     setup_logging_from_cfg(CFG, app_name="build_merged")
     logger = logging.getLogger(__name__)
     try:
+        from src.transform.merge_data import merge_weather_ndvi
+
         out = merge_weather_ndvi(cloud_frac_max=0.6, interpolate_ndvi=True)
         logger.info("Merge complete")
         logger.info("Output: %s", MERGED_CSV)
@@ -1,57 +1,107 @@
 from __future__ import annotations
 
+import functools
 import json
-import sys
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-ROOT = Path(__file__).resolve().parents[1]
-SRC = ROOT / "src"
-if str(SRC) not in sys.path:
-    sys.path.insert(0, str(SRC))
-
 try:
-    from utils.config_loader import (
-        CFG,
-        WEATHER_CSV,
-        INDICES_CSV,
-        MERGED_CSV,
-        RS_DEBUG_CSV,
-        ALERTS_RAW_CSV,
-        ALERTS_GATED_CSV,
-        ALERTS_MERGED_CSV,
-        PERIOD_DATA_START,
-        PERIOD_DATA_END,
-        PERIOD_REPORT_START,
-        PERIOD_REPORT_END,
-    )
-    from utils.logging_utils import setup_logging_from_cfg
+    import orjson
 except ImportError:
-    from src.utils.config_loader import (
-        CFG,
-        WEATHER_CSV,
-        INDICES_CSV,
-        MERGED_CSV,
-        RS_DEBUG_CSV,
-        ALERTS_RAW_CSV,
-        ALERTS_GATED_CSV,
-        ALERTS_MERGED_CSV,
-        PERIOD_DATA_START,
-        PERIOD_DATA_END,
-        PERIOD_REPORT_START,
-        PERIOD_REPORT_END,
-    )
-    from src.utils.logging_utils import setup_logging_from_cfg
-
-
-def _load_csv(path: Path, parse_dates: list[str] | None = None) -> pd.DataFrame:
+    orjson = None
+
+from _bootstrap import ROOT, ensure_on_path
+
+ensure_on_path(ROOT)
+
+from src.utils.config_loader import (
+    CFG,
+    WEATHER_CSV,
+    INDICES_CSV,
+    MERGED_CSV,
+    RS_DEBUG_CSV,
+    ALERTS_RAW_CSV,
+    ALERTS_GATED_CSV,
+    ALERTS_MERGED_CSV,
+    PERIOD_DATA_START,
+    PERIOD_DATA_END,
+    PERIOD_REPORT_START,
+    PERIOD_REPORT_END,
+)
+from src.utils.logging_utils import setup_logging_from_cfg
+from src.utils.report_utils import STAGE_SUMMARY_JSON, filter_by_report_range
+from src.utils.io_utils import (
+    HAS_PYARROW,
+    empty_csv_frame,
+    fresh_parquet_sidecar,
+    read_date_range,
+    read_parquet_columns,
+)
+
+CSV_ENGINE = "pyarrow" if HAS_PYARROW else "c"
+
+MERGED_COLUMNS = ["date"]
+ALERT_COLUMNS = ["date"]
+EVENT_COLUMNS = ["start_date"]
+DEBUG_COLUMNS = [
+    "date",
+    "qc_ok",
+    "gating_ok",
+    "allow_alert",
+    "skip_reason",
+    "real_obs_day",
+    "rs_window_ok",
+]
+# Nullable booleans: a blank flag cell reads as <NA> (counted as False in
+# _flag_counts) instead of failing the parse.
+DEBUG_DTYPES = {
+    "qc_ok": "boolean",
+    "gating_ok": "boolean",
+    "allow_alert": "boolean",
+    "real_obs_day": "boolean",
+    "rs_window_ok": "boolean",
+    "skip_reason": "category",
+}
+DEBUG_CHUNK_ROWS = 1_000_000
+SUMMARY_WRITERS = 4
+
+
+def _parse_dates(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    for col in cols:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format="ISO8601", cache=True, errors="coerce")
+    return df
+
+
+def _load_csv(
+    path: Path,
+    parse_dates: list[str] | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    parse_dates = parse_dates or []
+    sidecar = fresh_parquet_sidecar(path)
+    if sidecar is not None:
+        return _parse_dates(read_parquet_columns(sidecar, columns), parse_dates)
     if not path.exists():
         return pd.DataFrame()
-    return pd.read_csv(path, parse_dates=parse_dates or [])
-
-
+    empty = empty_csv_frame(path, columns)
+    if empty is not None:
+        return empty
+    usecols = None
+    if columns is not None:
+        # The pyarrow engine only accepts a list of existing names, not a callable.
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in columns if c in header]
+    df = pd.read_csv(path, usecols=usecols, engine=CSV_ENGINE)
+    return _parse_dates(df, parse_dates)
+
+
+@functools.lru_cache(maxsize=64)
 def _rel(path: Path) -> str:
     try:
         return path.relative_to(ROOT).as_posix()
@@ -63,35 +113,32 @@ def _summary_path(csv_path: Path) -> Path:
     return csv_path.with_suffix(".summary.json")
 
 
-def _stage_summary_path() -> Path:
-    return MERGED_CSV.parent / "stage_summary.json"
+THRESHOLD_KEYS = (
+    "ndvi_crop",
+    "evi_crop",
+    "rs_max_age",
+    "ndmi_dry",
+    "msi_dry",
+    "precip_low7",
+    "ndmi_wet",
+    "precip_high7",
+    "heat_tmean7",
+    "heat_rh7",
+    "cold_tmin7",
+    "ndre_low",
+    "gndvi_low",
+    "slope7_drop",
+    "merge_gap_days",
+)
 
 
 def _thresholds(cfg: dict, rs_cfg: dict, gating_cfg: dict) -> dict:
-    keys = [
-        "ndvi_crop",
-        "evi_crop",
-        "rs_max_age",
-        "ndmi_dry",
-        "msi_dry",
-        "precip_low7",
-        "ndmi_wet",
-        "precip_high7",
-        "heat_tmean7",
-        "heat_rh7",
-        "cold_tmin7",
-        "ndre_low",
-        "gndvi_low",
-        "slope7_drop",
-        "merge_gap_days",
-    ]
-    out = {}
-    for k in keys:
-        if k in cfg:
-            v = cfg[k]
-            if isinstance(v, tuple):
-                v = list(v)
-            out[k] = v
+    present = cfg.keys() & set(THRESHOLD_KEYS)
+    out = {
+        k: list(cfg[k]) if isinstance(cfg[k], tuple) else cfg[k]
+        for k in THRESHOLD_KEYS
+        if k in present
+    }
 
     out.update(
         {
@@ -108,78 +155,161 @@ def _thresholds(cfg: dict, rs_cfg: dict, gating_cfg: dict) -> dict:
     return out
 
 
-def _pass_rates(debug: pd.DataFrame) -> dict:
-    if debug.empty:
+FLAG_COLUMNS = ["qc_ok", "gating_ok", "allow_alert", "real_obs_day", "rs_window_ok"]
+
+
+def _flag_counts(debug: pd.DataFrame) -> dict:
+    """Count every QC/gating flag in one pass over a stacked boolean array.
+
+    A missing flag column counts as zero days; only the pass-rate counts
+    (``rate_*``) fall back on ``skip_reason`` and ``qc_ok & gating_ok``.
+    """
+    total = int(len(debug))
+    flags = np.zeros((total, len(FLAG_COLUMNS)), dtype=np.bool_)
+    for j, col in enumerate(FLAG_COLUMNS):
+        if col in debug.columns:
+            flags[:, j] = debug[col].to_numpy(dtype=np.bool_, na_value=False)
+    counts = flags.sum(axis=0)
+    out = {col: int(counts[j]) for j, col in enumerate(FLAG_COLUMNS)}
+
+    qc_ok = flags[:, 0]
+    if "qc_ok" not in debug.columns and "skip_reason" in debug.columns:
+        qc_ok = debug["skip_reason"].to_numpy() == "ok"
+    qc_and_gating = np.logical_and(qc_ok, flags[:, 1])
+    allow_alert = flags[:, 2] if "allow_alert" in debug.columns else qc_and_gating
+    out["rate_qc_ok"] = int(qc_ok.sum())
+    out["rate_allow_alert"] = int(allow_alert.sum())
+    out["qc_and_gating_ok"] = int(qc_and_gating.sum())
+    out["total"] = total
+    return out
+
+
+def _pass_rates(flags: dict) -> dict:
+    total = flags["total"]
+    if not total:
         return {
             "qc_pass_rate": None,
             "gating_pass_rate": None,
             "allow_alert_rate": None,
         }
-    total = len(debug)
-    qc_ok = debug["qc_ok"] if "qc_ok" in debug.columns else (debug["skip_reason"] == "ok")
-    gating_ok = debug["gating_ok"] if "gating_ok" in debug.columns else pd.Series(False, index=debug.index)
-    allow_alert = debug["allow_alert"] if "allow_alert" in debug.columns else (qc_ok & gating_ok)
-    qc_ok_count = int(qc_ok.sum())
-    gating_pass_rate = float((qc_ok & gating_ok).sum()) / qc_ok_count if qc_ok_count else 0.0
+    qc_ok_count = flags["rate_qc_ok"]
+    gating_pass_rate = flags["qc_and_gating_ok"] / qc_ok_count if qc_ok_count else 0.0
     return {
-        "qc_pass_rate": float(qc_ok.mean()) if total else 0.0,
+        "qc_pass_rate": qc_ok_count / total,
         "gating_pass_rate": float(gating_pass_rate),
-        "allow_alert_rate": float(allow_alert.mean()) if total else 0.0,
+        "allow_alert_rate": flags["rate_allow_alert"] / total,
     }
 
 
-def _skip_reason_stats(debug: pd.DataFrame) -> dict:
-    if debug.empty or "skip_reason" not in debug.columns:
+def _skip_reason_stats(counts: dict, total: int) -> dict:
+    if not total or not counts:
         return {}
-    total = len(debug)
     order = ["missing_remote", "missing_weather", "nonfinite", "ok"]
-    counts = debug["skip_reason"].value_counts(dropna=False).reindex(order, fill_value=0)
     out = {}
     for key in order:
-        if key in counts:
-            count = int(counts[key])
-            out[key] = {"count": count, "ratio": round(count / total, 4)}
-    for key, count in debug["skip_reason"].value_counts(dropna=False).items():
+        count = int(counts.get(key, 0))
+        out[key] = {"count": count, "ratio": round(count / total, 4)}
+    for key, count in counts.items():
         if key not in out:
-            out[str(key)] = {"count": count, "ratio": round(count / total, 4)}
+            out[str(key)] = {"count": int(count), "ratio": round(int(count) / total, 4)}
     return out
 
 
-def _qc_counts(debug: pd.DataFrame) -> dict:
-    if debug.empty:
+def _qc_counts(flags: dict) -> dict:
+    if not flags["total"]:
         return {}
     return {
-        "total_days": int(len(debug)),
-        "real_obs_days": int(debug.get("real_obs_day", pd.Series(False, index=debug.index)).sum()),
-        "rs_window_ok_days": int(debug.get("rs_window_ok", pd.Series(False, index=debug.index)).sum()),
-        "qc_ok_days": int(debug.get("qc_ok", pd.Series(False, index=debug.index)).sum()),
-        "allow_alert_days": int(debug.get("allow_alert", pd.Series(False, index=debug.index)).sum()),
+        "total_days": flags["total"],
+        "real_obs_days": flags["real_obs_day"],
+        "rs_window_ok_days": flags["rs_window_ok"],
+        "qc_ok_days": flags["qc_ok"],
+        "allow_alert_days": flags["allow_alert"],
     }
 
 
 def _write_summary(path: Path, payload: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        path.write_bytes(
+            orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+        return
     path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-def _filter_by_report_range(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
-    if df.empty or date_col not in df.columns:
-        return df
-    start = pd.Timestamp(PERIOD_REPORT_START)
-    end = pd.Timestamp(PERIOD_REPORT_END)
-    return df[(df[date_col] >= start) & (df[date_col] <= end)]
+def _iter_debug_chunks(path: Path):
+    sidecar = fresh_parquet_sidecar(path)
+    if sidecar is not None:
+        yield _load_report_range(path, "date", DEBUG_COLUMNS)
+        return
+    if not path.exists():
+        return
+    for chunk in pd.read_csv(
+        path,
+        usecols=lambda c: c in DEBUG_COLUMNS,
+        dtype=DEBUG_DTYPES,
+        chunksize=DEBUG_CHUNK_ROWS,
+    ):
+        yield _parse_dates(chunk, ["date"])
+
+
+def _category_counts(values: pd.Series) -> dict:
+    """Histogram a low-cardinality column via its categorical codes."""
+    cat = values.astype("category")
+    codes = cat.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(cat.cat.categories))
+    out = {str(k): int(n) for k, n in zip(cat.cat.categories, counts) if n}
+    missing = int((codes < 0).sum())
+    if missing:
+        out["nan"] = missing
+    return out
+
+
+def _debug_stats(path: Path) -> tuple[dict, Counter]:
+    """Accumulate report-range flag counts and skip reasons chunk by chunk.
+
+    Only one chunk of the debug table is held in memory at a time.
+    """
+    flags = dict.fromkeys([*FLAG_COLUMNS, "rate_qc_ok", "rate_allow_alert", "qc_and_gating_ok", "total"], 0)
+    skip_counts: Counter = Counter()
+    for chunk in _iter_debug_chunks(path):
+        chunk = filter_by_report_range(chunk, "date")
+        if chunk.empty:
+            continue
+        for key, value in _flag_counts(chunk).items():
+            flags[key] += value
+        if "skip_reason" in chunk.columns:
+            skip_counts.update(_category_counts(chunk["skip_reason"]))
+    return flags, skip_counts
+
+
+def _load_report_range(path: Path, date_col: str, columns: list[str]) -> pd.DataFrame:
+    """Load ``columns`` of a stage table restricted to the report range."""
+    sidecar = fresh_parquet_sidecar(path)
+    if sidecar is None and path.exists():
+        empty = empty_csv_frame(path, columns)
+        if empty is not None:
+            return empty
+    if HAS_PYARROW and (sidecar is not None or path.exists()):
+        source, file_format = (sidecar, "parquet") if sidecar is not None else (path, "csv")
+        df = read_date_range(
+            source, date_col, PERIOD_REPORT_START, PERIOD_REPORT_END, columns, file_format
+        )
+        return _parse_dates(df, [date_col])
+    df = _load_csv(path, parse_dates=[date_col], columns=columns)
+    return filter_by_report_range(df, date_col)
 
 
 def _build_stage_summary(
     merged: pd.DataFrame,
-    debug: pd.DataFrame,
+    flags: dict,
     alerts_raw: pd.DataFrame,
     alerts_gated: pd.DataFrame,
     merged_events: pd.DataFrame,
 ) -> dict:
     total_days = int(len(merged))
-    qc_ok_days = int(debug.get("qc_ok", pd.Series(False, index=debug.index)).sum()) if not debug.empty else 0
-    allow_alert_days = int(debug.get("allow_alert", pd.Series(False, index=debug.index)).sum()) if not debug.empty else 0
+    qc_ok_days = flags["qc_ok"]
+    allow_alert_days = flags["allow_alert"]
     raw_alerts = int(len(alerts_raw))
     gated_alerts = int(len(alerts_gated))
     events_count = int(len(merged_events))
@@ -250,30 +380,22 @@ def main() -> None:
     setup_logging_from_cfg(CFG, app_name="build_stage_summaries")
     logger = logging.getLogger(__name__)
     try:
-        weather = _load_csv(WEATHER_CSV)
-        indices = _load_csv(INDICES_CSV)
-        merged = _load_csv(MERGED_CSV, parse_dates=["date"])
-        debug = _load_csv(RS_DEBUG_CSV, parse_dates=["date", "rs_support_date"])
-        alerts_raw = _load_csv(ALERTS_RAW_CSV, parse_dates=["date"])
-        alerts_gated = _load_csv(ALERTS_GATED_CSV, parse_dates=["date"])
-        merged_events = _load_csv(
-            ALERTS_MERGED_CSV, parse_dates=["start_date", "end_date", "peak_date"]
-        )
-
-        merged_report = _filter_by_report_range(merged, "date")
-        debug_report = _filter_by_report_range(debug, "date")
-        alerts_raw_report = _filter_by_report_range(alerts_raw, "date")
-        alerts_gated_report = _filter_by_report_range(alerts_gated, "date")
-        events_report = _filter_by_report_range(merged_events, "start_date")
+        weather = _load_csv(WEATHER_CSV, columns=["date"])
+        indices = _load_csv(INDICES_CSV, columns=["date"])
+        merged_report = _load_report_range(MERGED_CSV, "date", MERGED_COLUMNS)
+        alerts_raw_report = _load_report_range(ALERTS_RAW_CSV, "date", ALERT_COLUMNS)
+        alerts_gated_report = _load_report_range(ALERTS_GATED_CSV, "date", ALERT_COLUMNS)
+        events_report = _load_report_range(ALERTS_MERGED_CSV, "start_date", EVENT_COLUMNS)
 
         alert_cfg = CFG.get("composite_alerts", {}) if isinstance(CFG, dict) else {}
         rs_cfg = CFG.get("remote_sensing", {}) if isinstance(CFG, dict) else {}
         gating_cfg = CFG.get("gating", {}) if isinstance(CFG, dict) else {}
 
         thresholds = _thresholds(alert_cfg, rs_cfg, gating_cfg)
-        pass_rates = _pass_rates(debug_report)
-        skip_reason = _skip_reason_stats(debug_report)
-        qc_counts = _qc_counts(debug_report)
+        flags, skip_counts = _debug_stats(RS_DEBUG_CSV)
+        pass_rates = _pass_rates(flags)
+        skip_reason = _skip_reason_stats(skip_counts, flags["total"])
+        qc_counts = _qc_counts(flags)
         timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
         ranges = {
@@ -287,78 +409,73 @@ def main() -> None:
             },
         }
 
-        summaries = [
-            {
-                "stage": {"id": "stage_1", "name": "merged"},
-                "paths": {"inputs": [_rel(WEATHER_CSV), _rel(INDICES_CSV)], "output": _rel(MERGED_CSV)},
-                "rows": {
-                    "inputs": {"weather": int(len(weather)), "indices": int(len(indices))},
-                    "output": int(len(merged_report)),
-                },
-                "ranges": ranges,
-                "pass_rates": pass_rates,
-                "skip_reason": skip_reason,
-                "thresholds": thresholds,
-                "generated_at": timestamp,
-            },
-            {
-                "stage": {"id": "stage_2", "name": "rs_debug"},
-                "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(RS_DEBUG_CSV)},
-                "rows": {"inputs": int(len(merged_report)), "output": int(len(debug_report))},
-                "qc_counts": qc_counts,
-                "ranges": ranges,
-                "pass_rates": pass_rates,
-                "skip_reason": skip_reason,
-                "thresholds": thresholds,
-                "generated_at": timestamp,
-            },
-            {
-                "stage": {"id": "stage_3", "name": "alerts_raw", "gating_applied": False},
-                "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(ALERTS_RAW_CSV)},
-                "rows": {"inputs": int(len(merged_report)), "output": int(len(alerts_raw_report))},
-                "ranges": ranges,
-                "pass_rates": pass_rates,
-                "skip_reason": skip_reason,
-                "thresholds": thresholds,
-                "generated_at": timestamp,
-            },
-            {
-                "stage": {"id": "stage_4", "name": "alerts_gated", "gating_applied": True},
-                "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(ALERTS_GATED_CSV)},
-                "rows": {"inputs": int(len(merged_report)), "output": int(len(alerts_gated_report))},
-                "ranges": ranges,
-                "pass_rates": pass_rates,
-                "skip_reason": skip_reason,
-                "thresholds": thresholds,
-                "generated_at": timestamp,
-            },
-            {
-                "stage": {"id": "stage_5", "name": "events_merged"},
-                "paths": {"inputs": [_rel(ALERTS_GATED_CSV)], "output": _rel(ALERTS_MERGED_CSV)},
-                "rows": {"inputs": int(len(alerts_gated_report)), "output": int(len(events_report))},
-                "ranges": ranges,
-                "pass_rates": pass_rates,
-                "skip_reason": skip_reason,
-                "thresholds": thresholds,
-                "generated_at": timestamp,
-            },
-        ]
-
+        common = {
+            "ranges": ranges,
+            "pass_rates": pass_rates,
+            "skip_reason": skip_reason,
+            "thresholds": thresholds,
+            "generated_at": timestamp,
+        }
         outputs = [
-            (MERGED_CSV, summaries[0]),
-            (RS_DEBUG_CSV, summaries[1]),
-            (ALERTS_RAW_CSV, summaries[2]),
-            (ALERTS_GATED_CSV, summaries[3]),
-            (ALERTS_MERGED_CSV, summaries[4]),
+            (
+                MERGED_CSV,
+                {
+                    "stage": {"id": "stage_1", "name": "merged"},
+                    "paths": {"inputs": [_rel(WEATHER_CSV), _rel(INDICES_CSV)], "output": _rel(MERGED_CSV)},
+                    "rows": {
+                        "inputs": {"weather": int(len(weather)), "indices": int(len(indices))},
+                        "output": int(len(merged_report)),
+                    },
+                    **common,
+                },
+            ),
+            (
+                RS_DEBUG_CSV,
+                {
+                    "stage": {"id": "stage_2", "name": "rs_debug"},
+                    "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(RS_DEBUG_CSV)},
+                    "rows": {"inputs": int(len(merged_report)), "output": flags["total"]},
+                    "qc_counts": qc_counts,
+                    **common,
+                },
+            ),
+            (
+                ALERTS_RAW_CSV,
+                {
+                    "stage": {"id": "stage_3", "name": "alerts_raw", "gating_applied": False},
+                    "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(ALERTS_RAW_CSV)},
+                    "rows": {"inputs": int(len(merged_report)), "output": int(len(alerts_raw_report))},
+                    **common,
+                },
+            ),
+            (
+                ALERTS_GATED_CSV,
+                {
+                    "stage": {"id": "stage_4", "name": "alerts_gated", "gating_applied": True},
+                    "paths": {"inputs": [_rel(MERGED_CSV)], "output": _rel(ALERTS_GATED_CSV)},
+                    "rows": {"inputs": int(len(merged_report)), "output": int(len(alerts_gated_report))},
+                    **common,
+                },
+            ),
+            (
+                ALERTS_MERGED_CSV,
+                {
+                    "stage": {"id": "stage_5", "name": "events_merged"},
+                    "paths": {"inputs": [_rel(ALERTS_GATED_CSV)], "output": _rel(ALERTS_MERGED_CSV)},
+                    "rows": {"inputs": int(len(alerts_gated_report)), "output": int(len(events_report))},
+                    **common,
+                },
+            ),
         ]
-        for csv_path, payload in outputs:
-            _write_summary(_summary_path(csv_path), payload)
-
         stage_summary = _build_stage_summary(
-            merged_report, debug_report, alerts_raw_report, alerts_gated_report, events_report
+            merged_report, flags, alerts_raw_report, alerts_gated_report, events_report
         )
         stage_summary["ranges"] = ranges
-        _write_summary(_stage_summary_path(), stage_summary)
+
+        jobs = [(_summary_path(csv_path), payload) for csv_path, payload in outputs]
+        jobs.append((STAGE_SUMMARY_JSON, stage_summary))
+        with ThreadPoolExecutor(max_workers=SUMMARY_WRITERS) as pool:
+            list(pool.map(lambda job: _write_summary(*job), jobs))
 
         logger.info("Stage summaries written to %s", _rel(ALERTS_MERGED_CSV.parent))
     except Exception as exc:
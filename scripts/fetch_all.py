@@ -0,0 +1,52 @@
+"""
+Fetch weather (Open-Meteo) and spectral indices (GEE) concurrently.
+
+Both fetches are network-bound and independent, so they run on two threads
+and the wall time is roughly the slower of the two instead of their sum.
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from _bootstrap import ROOT, SCRIPTS, ensure_on_path
+
+ensure_on_path(ROOT, SCRIPTS)
+
+from src.utils.config_loader import CFG, WEATHER_CSV, INDICES_CSV
+from src.utils.logging_utils import setup_logging_from_cfg
+
+
+def _fetch_weather() -> None:
+    from src.fetch.open_meteo import fetch_and_save
+
+    fetch_and_save()
+
+
+def _fetch_indices() -> None:
+    from fetch_indices import save_indices
+
+    save_indices()
+
+
+def main() -> None:
+    setup_logging_from_cfg(CFG, app_name="fetch_all")
+    logger = logging.getLogger(__name__)
+    jobs = {"weather": _fetch_weather, "indices": _fetch_indices}
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {name: pool.submit(job) for name, job in jobs.items()}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as exc:
+                failed.append(name)
+                logger.error("Fetch %s failed: %s", name, exc)
+                logger.debug("Fetch %s traceback", name, exc_info=exc)
+    if failed:
+        raise SystemExit(1) from None
+    logger.info("Fetched weather=%s indices=%s", WEATHER_CSV, INDICES_CSV)
+
+
+if __name__ == "__main__":
+    main()
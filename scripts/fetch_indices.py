@@ -27,17 +27,21 @@ indices, adjust the ``add_indices`` function below.
 from __future__ import annotations
 
 import os
+import functools
+import hashlib
 import logging
 import json
+import time
+import multiprocessing
 from typing import List, Dict, Any, Optional
 
-import sys
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+from _bootstrap import ROOT, ensure_on_path
 
+ensure_on_path(ROOT)
+
+import numpy as np
 import pandas as pd
 
 try:
@@ -52,8 +56,35 @@ geemap = None
 from src.utils.config_loader import CFG
 from src.utils.logging_utils import setup_logging_from_cfg
 
+logger = logging.getLogger(__name__)
+
+HIGHVOL_URL = 'https://earthengine-highvolume.googleapis.com'
+# getInfo refuses collections larger than this; above it we fan out per image.
+GETINFO_LIMIT = 5000
+POOL_SIZE = 25
+CACHE_TTL_HOURS = 24
+
+INDEX_BANDS = [
+    ('NDVI', 'ndvi_mean'),
+    ('NDMI', 'ndmi_mean'),
+    ('NDRE', 'ndre_mean'),
+    ('EVI', 'evi_mean'),
+    ('GNDVI', 'gndvi_mean'),
+    ('MSI', 'msi_mean'),
+]
+
+
+INDEX_EXPRESSIONS = {
+    'NDVI': '(NIR - RED) / (NIR + RED)',
+    'NDMI': '(NIR - SWIR1) / (NIR + SWIR1)',
+    'NDRE': '(NIR - RE1) / (NIR + RE1)',
+    'EVI': '2.5 * (NIR - RED) / (NIR + 6 * RED - 7.5 * BLUE + 1.0)',
+    'GNDVI': '(NIR - GREEN) / (NIR + GREEN)',
+    'MSI': 'SWIR1 / NIR',
+}
+
 
-def authenticate_ee(project_id: Optional[str] = None) -> None:
+def authenticate_ee(project_id: Optional[str] = None, high_volume: bool = True) -> None:
     """Authenticate and initialize the Earth Engine API.
 
     This helper tries to initialize the Earth Engine client.  If the caller
@@ -69,19 +100,20 @@ def authenticate_ee(project_id: Optional[str] = None) -> None:
             with this session.  Starting from 2024, Earth Engine accounts
             must be linked to a Cloud project.  See ``config/config.yml``
             (``gee.project``) or the ``EE_PROJECT`` environment variable.
+        high_volume: Route requests through the high-volume endpoint, which
+            is meant for many concurrent ``getInfo`` calls (``gee.high_volume``).
     """
     project = project_id or os.environ.get('EE_PROJECT') or None
+    kwargs: Dict[str, Any] = {}
+    if project:
+        kwargs['project'] = project
+    if high_volume:
+        kwargs['opt_url'] = HIGHVOL_URL
     try:
-        if project:
-            ee.Initialize(project=project)
-        else:
-            ee.Initialize()
+        ee.Initialize(**kwargs)
     except Exception:
         ee.Authenticate()
-        if project:
-            ee.Initialize(project=project)
-        else:
-            ee.Initialize()
+        ee.Initialize(**kwargs)
 
 
 def mask_s2_sr_clouds(img: ee.Image) -> ee.Image:
@@ -120,23 +152,19 @@ def add_indices(img: ee.Image) -> ee.Image:
     Returns:
         The input image with new bands attached.
     """
-    b2 = img.select('B2')
-    b3 = img.select('B3')
-    b4 = img.select('B4')
-    b5 = img.select('B5')
-    b8 = img.select('B8')
-    b11 = img.select('B11')
-
-    ndvi = b8.subtract(b4).divide(b8.add(b4)).rename('NDVI')
-    ndmi = b8.subtract(b11).divide(b8.add(b11)).rename('NDMI')
-    ndre = b8.subtract(b5).divide(b8.add(b5)).rename('NDRE')
-    evi = b8.subtract(b4).multiply(2.5).divide(
-        b8.add(b4.multiply(6)).subtract(b2.multiply(7.5)).add(1.0)
-    ).rename('EVI')
-    gndvi = b8.subtract(b3).divide(b8.add(b3)).rename('GNDVI')
-    msi = b11.divide(b8).rename('MSI')
-
-    return img.addBands([ndvi, ndmi, ndre, evi, gndvi, msi])
+    bands = {
+        'BLUE': img.select('B2'),
+        'GREEN': img.select('B3'),
+        'RED': img.select('B4'),
+        'RE1': img.select('B5'),
+        'NIR': img.select('B8'),
+        'SWIR1': img.select('B11'),
+    }
+    # One expression node per index instead of a chain of arithmetic nodes.
+    return img.addBands([
+        img.expression(formula, bands).rename(name)
+        for name, formula in INDEX_EXPRESSIONS.items()
+    ])
 
 
 def extract_feature(img: ee.Image, region: ee.Geometry, scale: int = 10) -> ee.Feature:
@@ -148,32 +176,80 @@ def extract_feature(img: ee.Image, region: ee.Geometry, scale: int = 10) -> ee.F
         scale: Pixel resolution in metres for reduction (default 10 m).
 
     Returns:
-        An EE Feature with properties ``date`` (string) and each index mean.
+        An EE Feature with properties ``time_start`` (epoch milliseconds),
+        ``image_id`` (the scene's ``system:index``) and each index mean.
+        Dates are derived client-side, so no server-side formatting is needed.
     """
-    date_str = img.date().format('yyyy-MM-dd')
-    stats = img.select(['NDVI', 'NDMI', 'NDRE', 'EVI', 'GNDVI', 'MSI']).reduceRegion(
+    stats = img.select([band for band, _ in INDEX_BANDS]).reduceRegion(
         reducer=ee.Reducer.mean(),
         geometry=region,
         scale=scale,
         maxPixels=1_000_000_000,
+        tileScale=4,
     )
-    return ee.Feature(None, stats).set('date', date_str)
+    return ee.Feature(None, stats).set(
+        'time_start', img.get('system:time_start'),
+        'image_id', img.get('system:index'),
+    )
+
+
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(project: Optional[str], high_volume: bool, collection_name: str,
+                 region_geojson: Dict[str, Any], scale: int) -> None:
+    """Pool initializer: every worker process needs its own EE session."""
+    authenticate_ee(project, high_volume=high_volume)
+    _WORKER_STATE['collection'] = collection_name
+    _WORKER_STATE['region'] = ee.Geometry(region_geojson)
+    _WORKER_STATE['scale'] = scale
+
+
+def _fetch_one(image_id: str) -> Dict[str, Any]:
+    """Reduce a single scene (by ``system:index``) and return its properties."""
+    img = ee.Image(f"{_WORKER_STATE['collection']}/{image_id}").clip(_WORKER_STATE['region'])
+    img = add_indices(mask_s2_sr_clouds(img))
+    feature = extract_feature(img, _WORKER_STATE['region'], scale=_WORKER_STATE['scale'])
+    return feature.getInfo().get('properties') or {}  # type: ignore
+
+
+def _fetch_parallel(image_ids: List[str], project: Optional[str], high_volume: bool,
+                    collection_name: str, region: ee.Geometry, scale: int) -> List[Dict[str, Any]]:
+    initargs = (project, high_volume, collection_name, region.toGeoJSON(), scale)
+    # Spawned, not forked: fetch_all runs this fetch in a worker thread next to
+    # the weather download, and forking a threaded process can copy locks
+    # held mid-request into the children.
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(POOL_SIZE, initializer=_init_worker, initargs=initargs) as pool:
+        return pool.map(_fetch_one, image_ids)
+
+
+def _cache_paths(fingerprint: Dict[str, Any]) -> tuple[Path, Path]:
+    """Cache CSV and image-id list for a (roi, period, collection, cloud) combo."""
+    key = hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    cache_dir = Path(CFG['paths']['data_raw']) / 'cache'
+    return cache_dir / f'indices_{key}.csv', cache_dir / f'indices_{key}.ids.json'
 
 
-def fetch_indices() -> pd.DataFrame:
+def fetch_indices(use_cache: bool = True) -> pd.DataFrame:
     """Fetch spectral indices time series for the configured ROI and period.
 
     Reads settings from ``config/config.yml`` via ``src.utils.config_loader.CFG``.
     Returns a pandas DataFrame with columns ``date``, ``ndvi_mean``, ``ndmi_mean``,
     ``ndre_mean``, ``evi_mean``, ``gndvi_mean``, ``msi_mean``.
-    """
-    gee_cfg = CFG.get('gee', {}) or CFG.get('gee_s2', {}) or {}
-    project_id = gee_cfg.get('project') or os.environ.get('EE_PROJECT')
-    authenticate_ee(project_id)
 
+    Results are cached under ``data/raw/cache`` keyed on ROI, period,
+    collection and cloud threshold; a cache younger than ``gee.cache_ttl_hours``
+    is returned without contacting Earth Engine. An older cache is extended:
+    only scenes whose ``system:index`` is not in the cached id list are
+    reduced and appended. Cached scenes are never re-reduced; delete the
+    cache files to force a full refetch.
+    """
     region_cfg = CFG['region']
     period_cfg = CFG['period']
     gee_cfg = CFG.get('gee', {}) or CFG.get('gee_s2', {}) or {}
+    project_id = gee_cfg.get('project') or os.environ.get('EE_PROJECT')
+    high_volume = bool(gee_cfg.get('high_volume', True))
 
     start_date = period_cfg['start_date']
     end_date = period_cfg['end_date']
@@ -194,75 +270,91 @@ def fetch_indices() -> pd.DataFrame:
     polygon_path = region_cfg.get('roi_polygon_geojson') or None
 
     collection_name = gee_cfg.get('collection', 'COPERNICUS/S2_SR_HARMONIZED')
-
+    cloud_pct_max = float(gee_cfg.get('cloud_pct_max', 80))
+
+    cache_csv, cache_ids = _cache_paths({
+        'roi_rect': roi_rect,
+        'roi_polygon': polygon_path,
+        'start_date': start_date,
+        'end_date': end_date,
+        'collection': collection_name,
+        'cloud_pct_max': cloud_pct_max,
+    })
+    ttl_s = float(gee_cfg.get('cache_ttl_hours', CACHE_TTL_HOURS)) * 3600
+    if use_cache and cache_csv.exists() and time.time() - cache_csv.stat().st_mtime < ttl_s:
+        logger.info("Using cached indices %s", cache_csv.name)
+        return pd.read_csv(cache_csv, parse_dates=['date'], date_format='ISO8601')
+
+    cached_df: Optional[pd.DataFrame] = None
+    cached_ids: List[str] = []
+    if use_cache and cache_csv.exists() and cache_ids.exists():
+        cached_df = pd.read_csv(cache_csv, parse_dates=['date'], date_format='ISO8601')
+        cached_ids = json.loads(cache_ids.read_text(encoding='utf-8'))
+
+    authenticate_ee(project_id, high_volume=high_volume)
     region = _resolve_roi_geometry(roi_rect, polygon_path)
 
     collection = (
         ee.ImageCollection(collection_name)
         .filterBounds(region)
         .filterDate(start_date, end_date)
-        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 80))
+        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', cloud_pct_max))
+    )
+    if cached_ids:
+        # Scenes already in the cache are not reduced again.
+        collection = collection.filter(ee.Filter.inList('system:index', cached_ids).Not())
+    collection = (
+        collection
+        .map(lambda img: img.clip(region))
         .map(mask_s2_sr_clouds)
         .map(add_indices)
     )
 
-    count = collection.size().getInfo()
     try:
-        print(f"[INFO] {count} images found in the collection. Starting processing...")
-    except Exception:
-        pass
-    img_list = collection.toList(count)
-    records: List[Dict[str, Any]] = []
-    for i in range(count):
-        if (i == 0) or ((i + 1) % 10 == 0) or (i + 1 == count):
-            try:
-                print(f"[INFO] Processing image {i + 1}/{count}...")
-            except Exception:
-                pass
-        img = ee.Image(img_list.get(i))
-        date_str: str = img.date().format('yyyy-MM-dd').getInfo()  # type: ignore
-        stats: Dict[str, Any] = img.select(['NDVI', 'NDMI', 'NDRE', 'EVI', 'GNDVI', 'MSI']).reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=region,
-            scale=10,
-            maxPixels=1_000_000_000,
-        ).getInfo()
-        record: Dict[str, Any] = {'date': date_str}
-        for orig_name, out_name in [
-            ('NDVI', 'ndvi_mean'),
-            ('NDMI', 'ndmi_mean'),
-            ('NDRE', 'ndre_mean'),
-            ('EVI', 'evi_mean'),
-            ('GNDVI', 'gndvi_mean'),
-            ('MSI', 'msi_mean'),
-        ]:
-            value = stats.get(orig_name)
-            record[out_name] = value if value is not None else None
-        records.append(record)
-
-    df = pd.DataFrame(records)
-
-    rename_map = {
-        'NDVI': 'ndvi_mean',
-        'NDMI': 'ndmi_mean',
-        'NDRE': 'ndre_mean',
-        'EVI': 'evi_mean',
-        'GNDVI': 'gndvi_mean',
-        'MSI': 'msi_mean',
-    }
-    df = df.rename(columns=rename_map)
-
-    df['date'] = pd.to_datetime(df['date'])
+        # Reduce every scene server-side and pull the whole table in one round trip.
+        features = ee.FeatureCollection(
+            collection.map(lambda img: extract_feature(img, region, scale=10))
+        )
+        payload: Dict[str, Any] = features.getInfo()  # type: ignore
+        rows = [feature.get('properties') or {} for feature in payload.get('features', [])]
+        image_ids = [props.get('image_id') for props in rows]
+    except ee.EEException:
+        # Only list ids (one extra round trip) when the single call is refused.
+        image_ids = collection.aggregate_array('system:index').getInfo()  # type: ignore
+        if len(image_ids) <= GETINFO_LIMIT:
+            raise
+        rows = _fetch_parallel(image_ids, project_id, high_volume, collection_name, region, 10)
+
+    # Column-oriented from the start: one list per output column.
+    # Fully masked bands come back as None, which becomes NaN in a float64 array.
+    columns: Dict[str, Any] = {'date': [props.get('time_start') for props in rows]}
+    for orig_name, out_name in INDEX_BANDS:
+        columns[out_name] = np.array([props.get(orig_name) for props in rows], dtype='float64')
+    logger.info("%d images reduced.", len(rows))
+
+    df = pd.DataFrame(columns)
+
+    df['date'] = pd.to_datetime(df['date'], unit='ms').dt.normalize()
+    if cached_df is not None:
+        df = pd.concat([cached_df, df], ignore_index=True) if len(df) else cached_df
+        image_ids = cached_ids + list(image_ids)
     df = df.sort_values('date').reset_index(drop=True)
 
-    for col in rename_map.values():
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
+    cache_csv.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(cache_csv, index=False, encoding='utf-8')
+    cache_ids.write_text(json.dumps(image_ids), encoding='utf-8')
     return df
 
 
 def _resolve_roi_geometry(roi_rect, polygon_path):
+    roi_key = tuple(roi_rect) if roi_rect else None
+    return _roi_geometry(roi_key, polygon_path or None)
+
+
+@functools.lru_cache(maxsize=8)
+def _roi_geometry(roi_rect, polygon_path):
+    # Memoized so repeated fetches in one process reuse the same ee.Geometry
+    # (and the GeoJSON file is parsed once).
     if polygon_path:
         path = Path(polygon_path)
         if not path.is_absolute():
@@ -284,18 +376,23 @@ def _resolve_roi_geometry(roi_rect, polygon_path):
         raise ValueError("roi_polygon_geojson must be Polygon or MultiPolygon")
     if not roi_rect:
         raise ValueError("roi_rectangle is required when roi_polygon_geojson is not set")
-    return ee.Geometry.Rectangle(roi_rect)
+    return ee.Geometry.Rectangle(list(roi_rect))
 
 
-def main() -> None:
-    """Entry point for script execution."""
-    setup_logging_from_cfg(CFG, app_name="fetch_indices")
-    logger = logging.getLogger(__name__)
+def save_indices() -> str:
+    """Fetch the indices and write ``data/raw/indices.csv``; returns the path."""
     df = fetch_indices()
     outdir = os.path.join(CFG['paths']['data_raw'])
     os.makedirs(outdir, exist_ok=True)
     outfile = os.path.join(outdir, 'indices.csv')
     df.to_csv(outfile, index=False, encoding='utf-8', float_format='%.4f')
+    return outfile
+
+
+def main() -> None:
+    """Entry point for script execution."""
+    setup_logging_from_cfg(CFG, app_name="fetch_indices")
+    outfile = save_indices()
     logger.info("Spectral indices saved to %s", outfile)
 
 
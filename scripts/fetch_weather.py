@@ -5,15 +5,12 @@ from __future__ import annotations
 
 import argparse
 import logging
-import sys
-from pathlib import Path
 from typing import List, Optional
 
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+from _bootstrap import ROOT, ensure_on_path
+
+ensure_on_path(ROOT)
 
-from src.fetch.open_meteo import fetch_and_save
 from src.utils.config_loader import CFG, WEATHER_CSV
 from src.utils.logging_utils import setup_logging_from_cfg
 
@@ -44,9 +41,11 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> None:
+    args = parse_args()
     configure_logging()
     logger = logging.getLogger(__name__)
-    args = parse_args()
+    from src.fetch.open_meteo import fetch_and_save
+
     daily_vars: Optional[List[str]] = None
     if args.daily:
         daily_vars = [x.strip() for x in args.daily.split(",") if x.strip()]
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
+import argparse
+import importlib
 import subprocess
 import sys
-import os
 import logging
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-SCRIPTS = ROOT / "scripts"
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+from _bootstrap import ROOT, SCRIPTS, ensure_on_path
+
+ensure_on_path(ROOT)
 
 from src.utils.config_loader import (
     CFG,
@@ -21,21 +20,63 @@ from src.utils.config_loader import (
 )
 from src.utils.logging_utils import setup_logging_from_cfg
 
+# Stages whose main() accepts the shared in-memory ``frames`` dict.
+FRAME_STAGES = frozenset({"build_composite_alerts.py", "plot_composite_alerts.py", "make_report.py"})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="run every stage in its own interpreter instead of in-process",
+    )
+    return parser.parse_args()
 
-def _run_script(name: str, env: dict) -> None:
+
+def _run_script(name: str, isolate: bool, frames: dict | None = None) -> int:
+    """Run one stage script and return its exit code.
+
+    By default the stage's ``main()`` is called in this process, so pandas and
+    matplotlib are imported once for the whole pipeline. Stages listed in
+    ``FRAME_STAGES`` also share ``frames``, so the alert tables built in stage
+    04/05 reach the plot and report stages without a CSV round-trip.
+    """
     script = SCRIPTS / name
     if not script.exists():
         raise SystemExit(f"Missing script: {script}")
-    subprocess.run([sys.executable, str(script)], check=True, env=env)
+    if isolate:
+        return subprocess.run([sys.executable, str(script)]).returncode
+
+    argv = sys.argv
+    sys.argv = [str(script)]
+    try:
+        stage = importlib.import_module(script.stem)
+        if frames is not None and name in FRAME_STAGES:
+            stage.main(frames=frames)
+        else:
+            stage.main()
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        return 1
+    except Exception:
+        logging.getLogger(__name__).exception("Stage %s raised", name)
+        return 1
+    finally:
+        sys.argv = argv
+    return 0
 
 
 def main() -> None:
+    args = parse_args()
+    # The run id lands in os.environ (AGRISENSE_RUN_ID), so in-process stages and
+    # --isolate subprocesses both log under it.
     run_id = setup_logging_from_cfg(CFG, app_name="pipeline_composite_report")
     logger = logging.getLogger(__name__)
-    env = os.environ.copy()
-    env["AGRISENSE_RUN_ID"] = run_id
     status = "ok"
     failed_stage = None
+    frames: dict = {}
     for name in (
         "build_merged.py",
         "build_composite_alerts.py",
@@ -44,12 +85,14 @@ def main() -> None:
         "make_report.py",
     ):
         logger.info("Running %s", name)
-        try:
-            _run_script(name, env)
-        except subprocess.CalledProcessError as exc:
+        returncode = _run_script(name, args.isolate, frames)
+        if not args.isolate:
+            # In-process stages reconfigure the root logger; take it back.
+            setup_logging_from_cfg(CFG, app_name="pipeline_composite_report")
+        if returncode:
             status = "failed"
             failed_stage = name
-            logger.error("Pipeline failed at %s (exit=%s)", name, exc.returncode)
+            logger.error("Pipeline failed at %s (exit=%s)", name, returncode)
             break
 
     outputs = [
@@ -1,42 +1,119 @@
 from __future__ import annotations
 
+import argparse
+import importlib
 import subprocess
 import sys
-import os
 import logging
-from pathlib import Path
+import time
 
-ROOT = Path(__file__).resolve().parents[1]
-SCRIPTS = ROOT / "scripts"
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+from _bootstrap import ROOT, SCRIPTS, ensure_on_path
+
+ensure_on_path(ROOT)
 
 from src.utils.config_loader import CFG, WEATHER_CSV, INDICES_CSV, MERGED_CSV
 from src.utils.logging_utils import setup_logging_from_cfg
 
+# Stages in order; a tuple groups independent stages that may run concurrently.
+# The two fetches hit unrelated remote services, so only build_merged waits.
+STAGES = (("fetch_weather.py", "fetch_indices.py"), ("build_merged.py",))
+# In-process runs hand a concurrent group to its thread-based driver script,
+# which sets up logging once instead of racing two stage mains.
+GROUP_DRIVERS = {("fetch_weather.py", "fetch_indices.py"): "fetch_all.py"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="run every stage in its own interpreter instead of in-process",
+    )
+    return parser.parse_args()
+
+
+def _run_script(name: str, isolate: bool) -> int:
+    """Run one stage script and return its exit code.
 
-def _run_script(name: str, env: dict) -> None:
+    By default the stage's ``main()`` is called in this process, so pandas and
+    matplotlib are imported once for the whole pipeline.
+    """
     script = SCRIPTS / name
     if not script.exists():
         raise SystemExit(f"Missing script: {script}")
-    subprocess.run([sys.executable, str(script)], check=True, env=env)
+    if isolate:
+        return subprocess.run([sys.executable, str(script)]).returncode
+
+    argv = sys.argv
+    sys.argv = [str(script)]
+    try:
+        importlib.import_module(script.stem).main()
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        return 1
+    except Exception:
+        logging.getLogger(__name__).exception("Stage %s raised", name)
+        return 1
+    finally:
+        sys.argv = argv
+    return 0
+
+
+def _run_group(names: tuple[str, ...], isolate: bool) -> tuple[str, int]:
+    """Run a group of independent stages; return ``(failed_or_last_name, exit_code)``.
+
+    Isolated groups start one interpreter per stage and fail fast: the first
+    non-zero exit terminates the siblings still running.
+    """
+    if len(names) == 1:
+        return names[0], _run_script(names[0], isolate)
+    if not isolate:
+        driver = GROUP_DRIVERS[names]
+        return driver, _run_script(driver, isolate)
+
+    procs = {}
+    for name in names:
+        script = SCRIPTS / name
+        if not script.exists():
+            raise SystemExit(f"Missing script: {script}")
+        procs[name] = subprocess.Popen([sys.executable, str(script)])
+    try:
+        while procs:
+            for name, proc in list(procs.items()):
+                returncode = proc.poll()
+                if returncode is None:
+                    continue
+                del procs[name]
+                if returncode:
+                    return name, returncode
+            time.sleep(0.2)
+    finally:
+        for proc in procs.values():
+            proc.terminate()
+        for proc in procs.values():
+            proc.wait()
+    return names[-1], 0
 
 
 def main() -> None:
+    args = parse_args()
+    # The run id lands in os.environ (AGRISENSE_RUN_ID), so in-process stages and
+    # --isolate subprocesses both log under it.
     run_id = setup_logging_from_cfg(CFG, app_name="pipeline_fetch_merge")
     logger = logging.getLogger(__name__)
-    env = os.environ.copy()
-    env["AGRISENSE_RUN_ID"] = run_id
     status = "ok"
     failed_stage = None
-    for name in ("fetch_weather.py", "fetch_indices.py", "build_merged.py"):
-        logger.info("Running %s", name)
-        try:
-            _run_script(name, env)
-        except subprocess.CalledProcessError as exc:
+    for group in STAGES:
+        logger.info("Running %s", " + ".join(group))
+        name, returncode = _run_group(group, args.isolate)
+        if not args.isolate:
+            # In-process stages reconfigure the root logger; take it back.
+            setup_logging_from_cfg(CFG, app_name="pipeline_fetch_merge")
+        if returncode:
             status = "failed"
             failed_stage = name
-            logger.error("Pipeline failed at %s (exit=%s)", name, exc.returncode)
+            logger.error("Pipeline failed at %s (exit=%s)", name, returncode)
             break
 
     outputs = [
@@ -1,94 +1,192 @@
+import functools
+import hashlib
 import json
-import sys
 import logging
 from pathlib import Path
 import numpy as np
 import pandas as pd
+import matplotlib
+
+# Files only, never a window: pin the Agg backend so pyplot skips GUI probing.
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import FancyBboxPatch
 
-ROOT = Path(__file__).resolve().parents[1]
-SRC = ROOT / "src"
-if str(SRC) not in sys.path:
-    sys.path.insert(0, str(SRC))
-
-try:
-    from utils.config_loader import (
-        CFG,
-        MERGED_CSV,
-        ALERTS_GATED_CSV,
-        ALERTS_RAW_CSV,
-        ALERTS_MERGED_CSV,
-        RS_DEBUG_CSV,
-        ASSETS,
-        PERIOD_REPORT_START,
-        PERIOD_REPORT_END,
-    )
-    from utils.logging_utils import setup_logging_from_cfg
-except ImportError:
-    from src.utils.config_loader import (
-        CFG,
-        MERGED_CSV,
-        ALERTS_GATED_CSV,
-        ALERTS_RAW_CSV,
-        ALERTS_MERGED_CSV,
-        RS_DEBUG_CSV,
-        ASSETS,
-        PERIOD_REPORT_START,
-        PERIOD_REPORT_END,
-    )
-    from src.utils.logging_utils import setup_logging_from_cfg
+from _bootstrap import ROOT, ensure_on_path
+
+ensure_on_path(ROOT)
+
+from src.utils.config_loader import (
+    CFG,
+    MERGED_CSV,
+    ALERTS_GATED_CSV,
+    ALERTS_RAW_CSV,
+    ALERTS_MERGED_CSV,
+    RS_DEBUG_CSV,
+    ASSETS,
+    PERIOD_REPORT_START,
+    PERIOD_REPORT_END,
+)
+from src.utils.csv_cache import file_stamp, load_csv
+from src.utils.io_utils import fresh_parquet_sidecar, read_parquet_columns
+from src.utils.logging_utils import setup_logging_from_cfg
+from src.utils.report_utils import (
+    EVENT_LABELS,
+    filter_by_report_range,
+    load_stage_summary,
+)
 
 OUT_FUNNEL = ASSETS / "alert_pipeline_funnel.png"
 OUT_EVENTS_MONTHLY = ASSETS / "events_monthly_by_type.png"
 OUT_EVENTS_PIE = ASSETS / "events_type_pie.png"
-
-EVENT_META = {
-    "drought": ("\u5e72\u65f1", "#d62728"),
-    "waterlogging": ("\u6c34\u6d9d", "#3776ff"),
-    "heat_stress": ("\u70ed\u80c1\u8feb", "#8e44ad"),
-    "cold_stress": ("\u51b7\u80c1\u8feb", "#16a085"),
-    "nutrient_or_pest": ("\u8425\u517b/\u75c5\u866b\u7591\u4f3c\u4fe1\u53f7", "#f39c12"),
-    "composite": ("\u590d\u5408\u4e8b\u4ef6", "#111111"),
+# One column set for every 05_events.csv read, so they hit the same cache entry.
+EVENT_COLUMNS = ("start_date", "event_type")
+
+EVENT_COLORS = {
+    "drought": "#d62728",
+    "waterlogging": "#3776ff",
+    "heat_stress": "#8e44ad",
+    "cold_stress": "#16a085",
+    "nutrient_or_pest": "#f39c12",
+    "composite": "#111111",
 }
 
-plt.rcParams["font.sans-serif"] = [
+CJK_FONT_CANDIDATES = (
     "Microsoft YaHei",
     "SimHei",
     "Noto Sans CJK SC",
     "Arial Unicode MS",
-    "DejaVu Sans",
-]
-plt.rcParams["axes.unicode_minus"] = False
-
-
-def _load_stage_summary() -> dict | None:
-    path = MERGED_CSV.parent / "stage_summary.json"
-    if path.exists():
-        return json.loads(path.read_text(encoding="utf-8"))
-    return None
-
-
-def _filter_by_report_range(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
-    if df.empty or date_col not in df.columns:
-        return df
-    start = pd.Timestamp(PERIOD_REPORT_START)
-    end = pd.Timestamp(PERIOD_REPORT_END)
-    return df[(df[date_col] >= start) & (df[date_col] <= end)]
+)
+
+
+@functools.cache
+def _font_rc() -> dict:
+    """Font rcParams with the first installed CJK family, resolved once.
+
+    Listing every candidate makes matplotlib look each one up in the font
+    cache when text is first laid out; one lookup here replaces that. DejaVu
+    Sans (bundled with matplotlib) stays as the glyph fallback.
+    """
+    from matplotlib import font_manager
+
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    chosen = next((name for name in CJK_FONT_CANDIDATES if name in installed), None)
+    families = ["DejaVu Sans"] if chosen is None else [chosen, "DejaVu Sans"]
+    return {"font.sans-serif": families, "axes.unicode_minus": False}
+
+
+_FIGURE = None
+
+
+def _canvas(figsize: tuple[float, float]):
+    """Cleared single-axes figure of ``figsize``; one Figure serves every plot."""
+    global _FIGURE
+    if _FIGURE is None:
+        # Fonts are configured on first use, not at import, so importing this
+        # module (e.g. from the pipeline) leaves the global rcParams alone.
+        plt.rcParams.update(_font_rc())
+        # The tight layout engine runs inside savefig's own draw, so there is
+        # no separate fig.tight_layout() pass per plot. Margins are not fixed
+        # because they depend on the CJK font metrics and the data.
+        _FIGURE = plt.figure(dpi=140, layout="tight")
+    _FIGURE.clear()
+    _FIGURE.set_size_inches(figsize)
+    return _FIGURE, _FIGURE.add_subplot()
+
+
+def _release_canvas() -> None:
+    global _FIGURE
+    if _FIGURE is not None:
+        plt.close(_FIGURE)
+        _FIGURE = None
+
+
+def _input_key(*paths: Path, data: bytes = b"") -> str:
+    """Content fingerprint of the inputs of one figure, plus optional ``data``.
+
+    Contents rather than mtimes are hashed: the pipeline rewrites every stage
+    file on each run, usually with identical bytes, and that must not force a
+    re-render. The report range, the event labels, the chosen fonts and this
+    script itself are part of the key, so changing any of them re-renders.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{PERIOD_REPORT_START}:{PERIOD_REPORT_END}".encode())
+    digest.update(json.dumps([EVENT_LABELS, _font_rc()], sort_keys=True).encode())
+    digest.update(data)
+    for path in (Path(__file__), *paths):
+        try:
+            with path.open("rb") as fh:
+                file_digest = hashlib.blake2b()
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    file_digest.update(chunk)
+                digest.update(file_digest.digest())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+
+def _key_path(out: Path) -> Path:
+    return out.with_name(out.name + ".key")
+
+
+def _is_current(out: Path, key: str) -> bool:
+    try:
+        return out.exists() and _key_path(out).read_text(encoding="utf-8") == key
+    except OSError:
+        return False
+
+
+def _mark_current(out: Path, key: str) -> None:
+    _key_path(out).write_text(key, encoding="utf-8")
+
+
+def _read_csv(path: Path, date_col: str, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """Read ``columns`` (all if ``None``) of a stage table; do not mutate the result.
+
+    Frames are memoised per file mtime and size, so the fallback summary and
+    the event plots share one parse of 05_events.csv.
+    """
+    try:
+        stamp = file_stamp(path)
+    except OSError:
+        stamp = None
+    return _load_table(path, stamp, date_col, columns)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_table(path: Path, stamp: tuple[int, int] | None, date_col: str, columns: tuple[str, ...] | None) -> pd.DataFrame:
+    # A fresh Parquet sidecar is preferred: only the wanted columns are decoded
+    # and dates arrive already typed. CSVs go through the shared loader, which
+    # reuses its pickled snapshot while the CSV is unchanged.
+    sidecar = fresh_parquet_sidecar(path)
+    if sidecar is not None:
+        wanted = None if columns is None else list(columns)
+        return _with_dates(read_parquet_columns(sidecar, wanted), date_col)
+    if stamp is None:
+        return pd.DataFrame()
+    return load_csv(str(path), stamp, (date_col,), columns)
+
+
+def _with_dates(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+    if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], format="ISO8601", cache=True)
+    return df
 
 
 def _fallback_stage_summary() -> dict:
-    merged = pd.read_csv(MERGED_CSV, parse_dates=["date"]) if MERGED_CSV.exists() else pd.DataFrame()
-    debug = pd.read_csv(RS_DEBUG_CSV, parse_dates=["date"]) if RS_DEBUG_CSV.exists() else pd.DataFrame()
-    raw = pd.read_csv(ALERTS_RAW_CSV, parse_dates=["date"]) if ALERTS_RAW_CSV.exists() else pd.DataFrame()
-    gated = pd.read_csv(ALERTS_GATED_CSV, parse_dates=["date"]) if ALERTS_GATED_CSV.exists() else pd.DataFrame()
-    events = pd.read_csv(ALERTS_MERGED_CSV, parse_dates=["start_date"]) if ALERTS_MERGED_CSV.exists() else pd.DataFrame()
-
-    merged = _filter_by_report_range(merged, "date")
-    debug = _filter_by_report_range(debug, "date")
-    raw = _filter_by_report_range(raw, "date")
-    gated = _filter_by_report_range(gated, "date")
-    events = _filter_by_report_range(events, "start_date")
+    # Only row counts and two flags are needed; never decode the wide columns.
+    merged = _read_csv(MERGED_CSV, "date", ("date",))
+    debug = _read_csv(RS_DEBUG_CSV, "date", ("date", "qc_ok", "allow_alert"))
+    raw = _read_csv(ALERTS_RAW_CSV, "date", ("date",))
+    gated = _read_csv(ALERTS_GATED_CSV, "date", ("date",))
+    events = _read_csv(ALERTS_MERGED_CSV, "start_date", EVENT_COLUMNS)
+
+    merged = filter_by_report_range(merged, "date")
+    debug = filter_by_report_range(debug, "date")
+    raw = filter_by_report_range(raw, "date")
+    gated = filter_by_report_range(gated, "date")
+    events = filter_by_report_range(events, "start_date")
 
     total_days = int(len(merged))
     qc_ok_days = int(debug.get("qc_ok", pd.Series(False, index=debug.index)).sum()) if not debug.empty else 0
@@ -104,40 +202,54 @@ def _fallback_stage_summary() -> dict:
     return {"stages": stages}
 
 
+FUNNEL_TITLES = (
+    "01_merged\n日序列底表",
+    "02_rs_debug\nQC 质量判定",
+    "03_alerts_raw\n仅 QC 的告警",
+    "04_alerts_gated\nQC + 门禁",
+    "05_events\n事件合并",
+)
+# Box width, height and bottom edge, in axes coordinates.
+FUNNEL_BOX = (0.18, 0.6, 0.2)
+FUNNEL_BOX_STYLE = "round,pad=0.02,rounding_size=0.02"
+FUNNEL_EDGE = "#4c78a8"
+FUNNEL_ARROW = {"arrowstyle": "->", "lw": 1.2, "color": FUNNEL_EDGE}
+
+
+@functools.cache
+def _funnel_x(n_stages: int) -> tuple[float, ...]:
+    """Left edges of ``n_stages`` evenly spaced funnel boxes."""
+    return tuple(np.linspace(0.02, 0.98 - FUNNEL_BOX[0], n_stages).tolist())
+
+
 def _plot_pipeline_funnel(summary: dict) -> None:
     stages = summary.get("stages", [])
     if not stages:
         return
 
-    fig, ax = plt.subplots(figsize=(16, 4), dpi=140)
+    fig, ax = _canvas((16, 4))
     ax.axis("off")
-
-    titles = [
-        "01_merged\n日序列底表",
-        "02_rs_debug\nQC 质量判定",
-        "03_alerts_raw\n仅 QC 的告警",
-        "04_alerts_gated\nQC + 门禁",
-        "05_events\n事件合并",
-    ]
-
-    width = 0.18
-    height = 0.6
-    y = 0.2
-    x_positions = np.linspace(0.02, 0.98 - width, len(stages))
-
-    for i, stage in enumerate(stages):
-        x = x_positions[i]
-        box = FancyBboxPatch(
-            (x, y),
-            width,
-            height,
-            boxstyle="round,pad=0.02,rounding_size=0.02",
+    to_axes = ax.transAxes
+
+    width, height, y = FUNNEL_BOX
+    x_positions = _funnel_x(len(stages))
+    y_mid = y + height / 2
+
+    # All boxes share one style, so they go into a single collection that is
+    # drawn in one pass instead of one artist per stage.
+    boxes = [FancyBboxPatch((x, y), width, height, boxstyle=FUNNEL_BOX_STYLE) for x in x_positions]
+    ax.add_collection(
+        PatchCollection(
+            boxes,
             linewidth=1,
-            edgecolor="#4c78a8",
+            edgecolor=FUNNEL_EDGE,
             facecolor="#f2f5f9",
-            transform=ax.transAxes,
+            transform=to_axes,
         )
-        ax.add_patch(box)
+    )
+
+    for i, stage in enumerate(stages):
+        x = x_positions[i]
 
         days = stage.get("days_count", 0)
         alerts = stage.get("alerts_count", None)
@@ -146,45 +258,48 @@ def _plot_pipeline_funnel(summary: dict) -> None:
         events_text = "-" if events is None else str(events)
 
         text = (
-            f"{titles[i]}\n"
+            f"{FUNNEL_TITLES[i]}\n"
             f"通过天数: {days}\n"
             f"告警条数: {alerts_text}\n"
             f"事件数: {events_text}"
         )
-        ax.text(
-            x + width / 2,
-            y + height / 2,
-            text,
-            ha="center",
-            va="center",
-            fontsize=9,
-            transform=ax.transAxes,
-        )
+        ax.text(x + width / 2, y_mid, text, ha="center", va="center", fontsize=9, transform=to_axes)
 
         if i < len(stages) - 1:
             ax.annotate(
                 "",
-                xy=(x + width, y + height / 2),
-                xytext=(x_positions[i + 1], y + height / 2),
-                xycoords=ax.transAxes,
-                textcoords=ax.transAxes,
-                arrowprops=dict(arrowstyle="->", lw=1.2, color="#4c78a8"),
+                xy=(x + width, y_mid),
+                xytext=(x_positions[i + 1], y_mid),
+                xycoords=to_axes,
+                textcoords=to_axes,
+                arrowprops=FUNNEL_ARROW,
             )
 
-    fig.tight_layout()
-    ASSETS.mkdir(parents=True, exist_ok=True)
     fig.savefig(OUT_FUNNEL)
-    plt.close(fig)
 
 
-def _plot_events_monthly_by_type() -> None:
-    if not ALERTS_MERGED_CSV.exists():
-        return
-    events = pd.read_csv(ALERTS_MERGED_CSV, parse_dates=["start_date"]) if ALERTS_MERGED_CSV.exists() else pd.DataFrame()
+def _report_events(events: pd.DataFrame | None = None) -> pd.DataFrame | None:
+    """Report-range stage-05 events, or ``None`` when there are none.
+
+    ``events`` is the stage-05 frame when the caller already has it in memory;
+    otherwise it is read from its CSV.
+    """
+    if events is not None:
+        events = _with_dates(events.copy(), "start_date")
+    elif ALERTS_MERGED_CSV.exists():
+        events = _read_csv(ALERTS_MERGED_CSV, "start_date", EVENT_COLUMNS)
+    else:
+        return None
     if events.empty or "event_type" not in events.columns:
-        return
-    events = _filter_by_report_range(events, "start_date")
+        return None
+    events = filter_by_report_range(events, "start_date")
     if events.empty:
+        return None
+    return events
+
+
+def _plot_events_monthly_by_type(events: pd.DataFrame | None) -> None:
+    if events is None:
         return
     events = events.assign(month=events["start_date"].dt.month)
     counts = (
@@ -194,10 +309,11 @@ def _plot_events_monthly_by_type() -> None:
         .reindex(index=range(1, 13), fill_value=0)
     )
 
-    fig, ax = plt.subplots(figsize=(12, 5), dpi=140)
+    fig, ax = _canvas((12, 5))
     bottom = np.zeros(len(counts))
     for event_type in counts.columns:
-        label, color = EVENT_META.get(event_type, (str(event_type), "#999999"))
+        label = EVENT_LABELS.get(event_type, str(event_type))
+        color = EVENT_COLORS.get(event_type, "#999999")
         values = counts[event_type].values
         ax.bar(counts.index, values, bottom=bottom, label=label, color=color)
         bottom += values
@@ -209,46 +325,59 @@ def _plot_events_monthly_by_type() -> None:
     ax.legend(frameon=False, ncol=2)
     ax.grid(axis="y", alpha=0.2)
 
-    fig.tight_layout()
-    ASSETS.mkdir(parents=True, exist_ok=True)
     fig.savefig(OUT_EVENTS_MONTHLY)
-    plt.close(fig)
 
 
-def _plot_events_type_pie() -> None:
-    if not ALERTS_MERGED_CSV.exists():
-        return
-    events = pd.read_csv(ALERTS_MERGED_CSV, parse_dates=["start_date"]) if ALERTS_MERGED_CSV.exists() else pd.DataFrame()
-    if events.empty or "event_type" not in events.columns:
-        return
-    events = _filter_by_report_range(events, "start_date")
-    if events.empty:
+def _plot_events_type_pie(events: pd.DataFrame | None) -> None:
+    if events is None:
         return
     counts = events["event_type"].value_counts()
     labels = []
     colors = []
     for event_type in counts.index:
-        label, color = EVENT_META.get(event_type, (str(event_type), "#999999"))
-        labels.append(label)
-        colors.append(color)
+        labels.append(EVENT_LABELS.get(event_type, str(event_type)))
+        colors.append(EVENT_COLORS.get(event_type, "#999999"))
 
-    fig, ax = plt.subplots(figsize=(6, 6), dpi=140)
+    fig, ax = _canvas((6, 6))
     ax.pie(counts.values, labels=labels, colors=colors, autopct="%1.1f%%", startangle=90)
     ax.set_title("\u4e8b\u4ef6\u7c7b\u578b\u5360\u6bd4")
     ax.axis("equal")
-    fig.tight_layout()
-    ASSETS.mkdir(parents=True, exist_ok=True)
     fig.savefig(OUT_EVENTS_PIE)
-    plt.close(fig)
 
 
-def main() -> None:
+def main(frames: dict | None = None) -> None:
+    """Render the report figures; ``frames`` may carry the in-memory stage-05 ``events``."""
+    frames = frames or {}
     setup_logging_from_cfg(CFG, app_name="plot_composite_alerts")
     logger = logging.getLogger(__name__)
-    summary = _load_stage_summary() or _fallback_stage_summary()
-    _plot_pipeline_funnel(summary)
-    _plot_events_monthly_by_type()
-    _plot_events_type_pie()
+    ASSETS.mkdir(parents=True, exist_ok=True)
+    try:
+        # A figure whose inputs are unchanged since it was last saved is skipped.
+        # The funnel only shows the summary's stage counts, so key on those:
+        # the summary's generated_at changes on every run.
+        summary = load_stage_summary()
+        if summary is not None:
+            funnel_key = _input_key(data=json.dumps(summary.get("stages", []), sort_keys=True).encode())
+        else:
+            funnel_key = _input_key(MERGED_CSV, RS_DEBUG_CSV, ALERTS_RAW_CSV, ALERTS_GATED_CSV, ALERTS_MERGED_CSV)
+        if _is_current(OUT_FUNNEL, funnel_key):
+            logger.info("Inputs unchanged, keeping %s", OUT_FUNNEL.name)
+        else:
+            _plot_pipeline_funnel(summary or _fallback_stage_summary())
+            _mark_current(OUT_FUNNEL, funnel_key)
+
+        events_key = _input_key(ALERTS_MERGED_CSV)
+        if _is_current(OUT_EVENTS_MONTHLY, events_key) and _is_current(OUT_EVENTS_PIE, events_key):
+            logger.info("Inputs unchanged, keeping %s and %s", OUT_EVENTS_MONTHLY.name, OUT_EVENTS_PIE.name)
+        else:
+            events = _report_events(frames.get("events"))
+            _plot_events_monthly_by_type(events)
+            _plot_events_type_pie(events)
+            if events is not None:
+                _mark_current(OUT_EVENTS_MONTHLY, events_key)
+                _mark_current(OUT_EVENTS_PIE, events_key)
+    finally:
+        _release_canvas()
     logger.info("Plots saved to %s", ASSETS)
 
 
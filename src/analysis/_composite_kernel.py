@@ -0,0 +1,99 @@
+"""
+_composite_kernel.py
+====================
+
+Optional compiled kernel for the composite alert trigger rules.
+
+When ``numba`` is installed, ``trigger_bits()`` returns a compiled function
+that evaluates the five rules of ``composite_alerts._classify`` in one fused
+loop over the daily columns, with one bit per fired rule. Without numba,
+``HAS_NUMBA`` is ``False`` and the caller keeps its NumPy mask path. Both
+implementations must stay in step.
+
+numba is only imported, and the kernel only compiled, on first use. Compiling
+takes about a second, so callers reserve the kernel for long inputs. The
+compiled code is not cached on disk: numba's cache records the importing
+module name, and this module is imported both as ``analysis.*`` and as
+``src.analysis.*``. Thresholds are passed in rather than read from module
+globals, which numba would freeze at compile time.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.util
+
+import numpy as np
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+# Order of the values in the ``thresholds`` argument.
+THRESHOLD_NAMES = (
+    "ndmi_dry",
+    "msi_dry",
+    "precip_low7",
+    "ndmi_wet",
+    "precip_high7",
+    "evi_crop",
+    "ndvi_crop",
+    "heat_tmean7",
+    "heat_rh7",
+    "slope7_drop",
+    "cold_tmin7",
+    "ndre_low",
+    "gndvi_low",
+)
+
+
+def _trigger_bits(ndvi, evi, ndmi, msi, ndre, gnd, p7, t7, rh7, tmin7, slope7, eligible, thresholds):
+    """Bit ``k`` of each result is set where rule ``k`` fires on an eligible, canopy day."""
+    (
+        ndmi_dry,
+        msi_dry,
+        precip_low7,
+        ndmi_wet,
+        precip_high7,
+        evi_crop,
+        ndvi_crop,
+        heat_tmean7,
+        heat_rh7,
+        slope7_drop,
+        cold_tmin7,
+        ndre_low,
+        gndvi_low,
+    ) = thresholds
+    n = ndvi.shape[0]
+    out = np.zeros(n, dtype=np.uint8)
+    for i in range(n):
+        # NaN compares False, so this matches "present and above threshold".
+        if not eligible[i] or not (ndvi[i] >= ndvi_crop or evi[i] >= evi_crop):
+            continue
+        bits = 0
+        if np.isfinite(ndmi[i]) and np.isfinite(msi[i]) and np.isfinite(p7[i]):
+            if (ndmi[i] < ndmi_dry or msi[i] > msi_dry) and p7[i] < precip_low7:
+                bits |= 1
+        if np.isfinite(ndmi[i]) and np.isfinite(p7[i]) and np.isfinite(evi[i]) and np.isfinite(ndvi[i]):
+            if ndmi[i] > ndmi_wet and p7[i] > precip_high7 and (evi[i] < evi_crop or ndvi[i] < ndvi_crop):
+                bits |= 2
+        if np.isfinite(t7[i]) and np.isfinite(rh7[i]) and np.isfinite(evi[i]) and np.isfinite(slope7[i]):
+            if t7[i] >= heat_tmean7 and rh7[i] <= heat_rh7 and (evi[i] < evi_crop or slope7[i] <= slope7_drop):
+                bits |= 4
+        if np.isfinite(tmin7[i]) and np.isfinite(evi[i]) and np.isfinite(ndvi[i]) and np.isfinite(slope7[i]):
+            if tmin7[i] <= cold_tmin7 and (evi[i] < 0.40 or ndvi[i] < 0.50 or slope7[i] <= slope7_drop):
+                bits |= 8
+        if np.isfinite(ndre[i]) and np.isfinite(gnd[i]) and np.isfinite(ndmi[i]):
+            if (ndre[i] < ndre_low or gnd[i] < gndvi_low) and ndmi[i] >= ndmi_dry:
+                bits |= 16
+        out[i] = bits
+    return out
+
+
+@functools.cache
+def trigger_bits():
+    """The compiled ``_trigger_bits`` (requires ``HAS_NUMBA``)."""
+    import numba
+
+    # The loop is a handful of compares per row and memory bound, so it stays
+    # serial rather than paying thread start-up for parallel=True. fastmath is
+    # left off: it would let the compiler assume the inputs contain no NaN.
+    return numba.njit(nogil=True)(_trigger_bits)
@@ -13,6 +13,7 @@ try:
         ALERTS_MERGED_CSV,
         RS_DEBUG_CSV,
     )
+    from src.utils.io_utils import write_parquet_sidecar
 except ImportError:
     from utils.config_loader import (
         CFG,
@@ -22,6 +23,9 @@ except ImportError:
         ALERTS_MERGED_CSV,
         RS_DEBUG_CSV,
     )
+    from utils.io_utils import write_parquet_sidecar
+
+from ._composite_kernel import HAS_NUMBA, trigger_bits
 
 MERGED = MERGED_CSV
 OUT = ALERTS_GATED_CSV
@@ -112,6 +116,24 @@ METRIC_DEFS = {
 }
 
 
+WEATHER_INPUT_COLUMNS = [
+    "precip_7d",
+    "precipitation_sum",
+    "tmean_7d",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "rh_7d",
+    "relative_humidity_2m_mean",
+    "tmin_7d",
+    "ndvi_slope7",
+]
+RS_OBS_COLS = frozenset(meta["obs"][0] for meta in METRIC_DEFS.values())
+MERGED_INPUT_COLUMNS = frozenset(
+    ["date", *WEATHER_INPUT_COLUMNS]
+    + [c for meta in METRIC_DEFS.values() for c in (*meta["obs"], *meta["fill"])]
+)
+
+
 def _ensure_metric_columns(df: pd.DataFrame) -> pd.DataFrame:
     for meta in METRIC_DEFS.values():
         obs_col = meta["obs"][0]
@@ -133,6 +155,15 @@ def _ensure_metric_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _any_notna(df: pd.DataFrame, cols: frozenset[str]) -> pd.Series:
+    """Row-wise "any of ``cols`` present", OR-reduced over flat column buffers."""
+    mask = np.zeros(len(df), dtype=bool)
+    if len(df):
+        for c in cols.intersection(df.columns):
+            mask |= df[c].notna().to_numpy()
+    return pd.Series(mask, index=df.index)
+
+
 def _finite_df(df: pd.DataFrame, cols: list[str]) -> pd.Series:
     if not cols:
         return pd.Series(True, index=df.index)
@@ -181,13 +212,6 @@ def _pick_support_date(
     return min(closest)
 
 
-def _canopy_ok(row: pd.Series) -> bool:
-    ndvi = row.get("ndvi_fill", np.nan)
-    evi = row.get("evi_fill", np.nan)
-    ok = (pd.notna(ndvi) and ndvi >= NDVI_CROP) or (pd.notna(evi) and evi >= EVI_CROP)
-    return bool(ok)
-
-
 def _gating_mask(df: pd.DataFrame, mode: str) -> pd.Series:
     if mode == "off":
         return pd.Series(True, index=df.index)
@@ -198,67 +222,149 @@ def _gating_mask(df: pd.DataFrame, mode: str) -> pd.Series:
     return df["canopy_obs_ready"].fillna(False)
 
 
-def _classify_row(row: pd.Series, apply_gating: bool) -> tuple[str | None, str]:
-    if not row.get("qc_ok", False):
-        return None, ""
-    if apply_gating and not row.get("gating_ok", False):
-        return None, ""
-
-    ndvi = row.get("ndvi_fill", np.nan)
-    evi = row.get("evi_fill", np.nan)
-    ndmi = row.get("ndmi_fill", np.nan)
-    msi = row.get("msi_fill", np.nan)
-    ndre = row.get("ndre_fill", np.nan)
-    gnd = row.get("gndvi_fill", np.nan)
-    p7 = row.get("precip_7d", np.nan)
-    t7 = row.get("tmean_7d", np.nan)
-    rh7 = row.get("rh_7d", np.nan)
-    tmin7 = row.get("tmin_7d", np.nan)
-    slope7 = row.get("ndvi_slope7", np.nan)
-    canopy = _canopy_ok(row)
-
-    trig = []
-
-    if canopy and _finite_row(row, "ndmi_fill", "msi_fill", "precip_7d"):
-        if (ndmi < NDMI_DRY or msi > MSI_DRY) and (p7 < PRECIP_LOW7):
-            trig.append(("drought", f"NDMI={ndmi:.3f}/MSI={msi:.3f}; precip_7d={p7:.1f}"))
-
-    if canopy and _finite_row(row, "ndmi_fill", "precip_7d", "evi_fill", "ndvi_fill"):
-        if (ndmi > NDMI_WET) and (p7 > PRECIP_HIGH7) and ((evi < EVI_CROP) or (ndvi < NDVI_CROP)):
-            trig.append(
-                (
-                    "waterlogging",
-                    f"NDMI={ndmi:.3f}; precip_7d={p7:.1f}; EVI={evi:.3f}, NDVI={ndvi:.3f}",
-                )
-            )
-
-    if canopy and _finite_row(row, "tmean_7d", "rh_7d", "evi_fill", "ndvi_slope7"):
-        if (t7 >= HEAT_TMEAN7) and (rh7 <= HEAT_RH7) and ((evi < EVI_CROP) or (slope7 <= SLOPE7_DROP)):
-            trig.append(
-                (
-                    "heat_stress",
-                    f"tmean_7d={t7:.1f}C, RH7={rh7:.0f}%, slope7={slope7:.3f}, EVI={evi:.3f}",
-                )
-            )
-
-    if canopy and _finite_row(row, "tmin_7d", "evi_fill", "ndvi_fill", "ndvi_slope7"):
-        if (tmin7 <= COLD_TMIN7) and ((evi < 0.40) or (ndvi < 0.50) or (slope7 <= SLOPE7_DROP)):
-            trig.append(
-                (
-                    "cold_stress",
-                    f"tmin_7d={tmin7:.1f}?C, EVI={evi:.3f}, NDVI={ndvi:.3f}, slope7={slope7:.3f}",
-                )
-            )
-
-    if canopy and _finite_row(row, "ndre_fill", "gndvi_fill", "ndmi_fill"):
-        if ((ndre < NDRE_LOW) or (gnd < GNDVI_LOW)) and (ndmi >= NDMI_DRY):
-            trig.append(("nutrient_or_pest", f"NDRE={ndre:.3f}, GNDVI={gnd:.3f}, NDMI={ndmi:.3f}"))
-
-    if len(trig) == 0:
-        return None, ""
-    if len(trig) >= 2:
-        return "composite", " + ".join(k for k, _ in trig)
-    return trig[0][0], trig[0][1]
+# Per-type reason text: format string and the daily values it is filled from.
+EVENT_REASONS = (
+    ("drought", "NDMI={:.3f}/MSI={:.3f}; precip_7d={:.1f}", ("ndmi_fill", "msi_fill", "precip_7d")),
+    (
+        "waterlogging",
+        "NDMI={:.3f}; precip_7d={:.1f}; EVI={:.3f}, NDVI={:.3f}",
+        ("ndmi_fill", "precip_7d", "evi_fill", "ndvi_fill"),
+    ),
+    (
+        "heat_stress",
+        "tmean_7d={:.1f}C, RH7={:.0f}%, slope7={:.3f}, EVI={:.3f}",
+        ("tmean_7d", "rh_7d", "ndvi_slope7", "evi_fill"),
+    ),
+    (
+        "cold_stress",
+        "tmin_7d={:.1f}?C, EVI={:.3f}, NDVI={:.3f}, slope7={:.3f}",
+        ("tmin_7d", "evi_fill", "ndvi_fill", "ndvi_slope7"),
+    ),
+    ("nutrient_or_pest", "NDRE={:.3f}, GNDVI={:.3f}, NDMI={:.3f}", ("ndre_fill", "gndvi_fill", "ndmi_fill")),
+)
+
+
+def _float_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[col].to_numpy(dtype=float, na_value=np.nan)
+
+
+CLASSIFY_INPUT_COLUMNS = (
+    "ndvi_fill",
+    "evi_fill",
+    "ndmi_fill",
+    "msi_fill",
+    "ndre_fill",
+    "gndvi_fill",
+    "precip_7d",
+    "tmean_7d",
+    "rh_7d",
+    "tmin_7d",
+    "ndvi_slope7",
+)
+# The compiled trigger kernel costs about a second to build per process and
+# saves some tens of nanoseconds per row over the NumPy masks, so it is only
+# worth it on very long inputs (many fields or sub-daily series).
+KERNEL_MIN_ROWS = 20_000_000
+# Threshold values in the order _composite_kernel.THRESHOLD_NAMES expects.
+KERNEL_THRESHOLDS = (
+    NDMI_DRY,
+    MSI_DRY,
+    PRECIP_LOW7,
+    NDMI_WET,
+    PRECIP_HIGH7,
+    EVI_CROP,
+    NDVI_CROP,
+    HEAT_TMEAN7,
+    HEAT_RH7,
+    SLOPE7_DROP,
+    COLD_TMIN7,
+    NDRE_LOW,
+    GNDVI_LOW,
+)
+
+
+def _trigger_matrix(v: dict[str, np.ndarray], eligible: np.ndarray) -> np.ndarray:
+    """NumPy fallback of ``_composite_kernel.trigger_bits``: one bool column per rule."""
+    finite = {c: np.isfinite(a) for c, a in v.items()}
+
+    def _all_finite(*cols: str) -> np.ndarray:
+        return np.logical_and.reduce([finite[c] for c in cols])
+
+    ndvi, evi, ndmi, msi = v["ndvi_fill"], v["evi_fill"], v["ndmi_fill"], v["msi_fill"]
+    ndre, gnd, p7 = v["ndre_fill"], v["gndvi_fill"], v["precip_7d"]
+    t7, rh7, tmin7, slope7 = v["tmean_7d"], v["rh_7d"], v["tmin_7d"], v["ndvi_slope7"]
+
+    # NaN compares False, so this matches "present and above threshold".
+    canopy = eligible & ((ndvi >= NDVI_CROP) | (evi >= EVI_CROP))
+
+    trig = np.column_stack(
+        [
+            _all_finite("ndmi_fill", "msi_fill", "precip_7d")
+            & ((ndmi < NDMI_DRY) | (msi > MSI_DRY))
+            & (p7 < PRECIP_LOW7),
+            _all_finite("ndmi_fill", "precip_7d", "evi_fill", "ndvi_fill")
+            & (ndmi > NDMI_WET)
+            & (p7 > PRECIP_HIGH7)
+            & ((evi < EVI_CROP) | (ndvi < NDVI_CROP)),
+            _all_finite("tmean_7d", "rh_7d", "evi_fill", "ndvi_slope7")
+            & (t7 >= HEAT_TMEAN7)
+            & (rh7 <= HEAT_RH7)
+            & ((evi < EVI_CROP) | (slope7 <= SLOPE7_DROP)),
+            _all_finite("tmin_7d", "evi_fill", "ndvi_fill", "ndvi_slope7")
+            & (tmin7 <= COLD_TMIN7)
+            & ((evi < 0.40) | (ndvi < 0.50) | (slope7 <= SLOPE7_DROP)),
+            _all_finite("ndre_fill", "gndvi_fill", "ndmi_fill")
+            & ((ndre < NDRE_LOW) | (gnd < GNDVI_LOW))
+            & (ndmi >= NDMI_DRY),
+        ]
+    )
+    trig &= canopy[:, None]
+    return trig
+
+
+def _classify(df: pd.DataFrame, apply_gating: bool, include_reasons: bool = True) -> pd.DataFrame:
+    """Alert rows (``date``, ``event_type``, ``reason``) for every triggering day.
+
+    Each rule is evaluated over whole columns (in one compiled loop for very
+    long inputs when numba is installed); a rule only fires where all of its
+    inputs are finite. Event types are derived for all days at once; reason
+    strings are formatted for triggered days only, and not at all without
+    ``include_reasons`` (the ``reason`` column is then omitted).
+    """
+    v = {c: _float_col(df, c) for c in CLASSIFY_INPUT_COLUMNS}
+    eligible = df["qc_ok"].to_numpy(dtype=bool, na_value=False)
+    if apply_gating:
+        eligible &= df["gating_ok"].to_numpy(dtype=bool, na_value=False)
+
+    if HAS_NUMBA and len(df) >= KERNEL_MIN_ROWS:
+        # Bit k of each day marks rule k, in EVENT_REASONS order.
+        kernel = trigger_bits()
+        bits = kernel(*(v[c] for c in CLASSIFY_INPUT_COLUMNS), eligible, KERNEL_THRESHOLDS)
+        trig = ((bits[:, None] >> np.arange(len(EVENT_REASONS))) & 1).astype(bool)
+    else:
+        trig = _trigger_matrix(v, eligible)
+
+    hit = np.flatnonzero(trig.any(axis=1))
+    if len(hit) == 0:
+        return pd.DataFrame()
+    trig = trig[hit]
+    composite = np.count_nonzero(trig, axis=1) >= 2
+    first = trig.argmax(axis=1)
+    names = np.array([name for name, _, _ in EVENT_REASONS], dtype=object)
+    out = {
+        "date": df["date"].to_numpy()[hit],
+        "event_type": np.where(composite, "composite", names[first]),
+    }
+    if include_reasons:
+        out["reason"] = [
+            " + ".join(names[fired])
+            if is_composite
+            else EVENT_REASONS[k][1].format(*(v[c][i] for c in EVENT_REASONS[k][2]))
+            for i, k, fired, is_composite in zip(hit, first, trig, composite)
+        ]
+    return pd.DataFrame(out)
 
 
 def _obs_streak(obs_ok: pd.Series, obs_flag: pd.Series) -> pd.Series:
@@ -352,13 +458,23 @@ def _merge_events(alerts: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
 
 
 def detect_composite_alerts(
-    df: pd.DataFrame, gating_mode: str = "both", apply_gating: bool = True
+    df: pd.DataFrame,
+    gating_mode: str = "both",
+    apply_gating: bool = True,
+    include_reasons: bool = True,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Alerts and the per-day debug table for ``df``.
+
+    Callers that only need dates and event types can pass
+    ``include_reasons=False`` to skip formatting the ``reason`` strings.
+    """
     if "date" not in df.columns:
         raise ValueError("df must contain 'date'")
     df = df.copy()
     df["date"] = pd.to_datetime(df["date"])
-    df.sort_values("date", inplace=True)
+    # Stable, so same-day rows keep their input order; the observation
+    # streaks depend on that order.
+    df.sort_values("date", kind="stable", inplace=True)
 
     df = _ensure_metric_columns(df)
 
@@ -382,8 +498,7 @@ def detect_composite_alerts(
     if "ndvi_slope7" not in df.columns:
         df["ndvi_slope7"] = df["ndvi_fill"] - df["ndvi_fill"].shift(7)
 
-    obs_cols = [meta["obs"][0] for meta in METRIC_DEFS.values() if meta["obs"][0] in df.columns]
-    obs_flag = df[obs_cols].notna().any(axis=1) if obs_cols else pd.Series(False, index=df.index)
+    obs_flag = _any_notna(df, RS_OBS_COLS)
     df["real_obs_day"] = obs_flag
 
     obs_ok = (df["ndvi_obs"] >= CANOPY_NDVI_MIN) | (df["evi_obs"] >= CANOPY_EVI_MIN)
@@ -425,12 +540,7 @@ def detect_composite_alerts(
     df["gating_ok"] = _gating_mask(df, gating_mode)
     df["allow_alert"] = df["qc_ok"] & df["gating_ok"]
 
-    rows = []
-    for _, r in df.iterrows():
-        et, reason = _classify_row(r, apply_gating=apply_gating)
-        if et:
-            rows.append({"date": r["date"], "event_type": et, "reason": reason})
-    out = pd.DataFrame(rows)
+    out = _classify(df, apply_gating=apply_gating, include_reasons=include_reasons)
     if not out.empty:
         out.sort_values("date", inplace=True)
 
@@ -450,12 +560,24 @@ def detect_composite_alerts(
         "gating_ok",
         "allow_alert",
     ]
-    debug = df[debug_cols].copy()
+    # List selection already returns a new frame; no second copy needed.
+    debug = df[debug_cols]
     return out, debug
 
 
-def run(infile: Path = MERGED, outfile: Path = OUT) -> Path:
-    df = pd.read_csv(infile, parse_dates=["date"])
+def run(infile: Path = MERGED, outfile: Path = OUT, frames: dict | None = None) -> Path:
+    """Build stages 02-05 from ``infile`` and write their CSVs.
+
+    When ``frames`` is given it is filled with the frames just written
+    (``alerts_raw``, ``alerts_gated``, ``events``, ``debug``) so an in-process
+    caller can hand them to later stages instead of re-reading the CSVs.
+    """
+    df = pd.read_csv(
+        infile,
+        usecols=lambda c: c in MERGED_INPUT_COLUMNS,
+        parse_dates=["date"],
+        date_format="ISO8601",
+    )
     df = _ensure_metric_columns(df)
 
     alerts_raw, _ = detect_composite_alerts(df, gating_mode="off", apply_gating=False)
@@ -467,5 +589,8 @@ def run(infile: Path = MERGED, outfile: Path = OUT) -> Path:
     alerts_gated.to_csv(outfile, index=False)
     merged_events.to_csv(OUT_MERGED, index=False)
     debug.to_csv(OUT_DEBUG, index=False)
+    write_parquet_sidecar(debug, OUT_DEBUG)
 
+    if frames is not None:
+        frames.update(alerts_raw=alerts_raw, alerts_gated=alerts_gated, events=merged_events, debug=debug)
     return outfile
@@ -52,7 +52,7 @@ def _json_to_df(payload: Dict[str, Any]) -> pd.DataFrame:
     daily = payload["daily"]
     df = pd.DataFrame(daily)
     df = df.rename(columns={"time": "date"})
-    df["date"] = pd.to_datetime(df["date"])
+    df["date"] = pd.to_datetime(df["date"], format="ISO8601", cache=True)
     df = df.sort_values("date")
     return df
 
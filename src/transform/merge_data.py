@@ -24,6 +24,7 @@ Example usage (from ``scripts/build_merged.py``)::
 from __future__ import annotations
 
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 from src.utils.config_loader import (
@@ -35,8 +36,10 @@ from src.utils.config_loader import (
     NDVI_CSV,
     MERGED_CSV,
 )
+from src.utils.io_utils import write_parquet_sidecar
 
 INDEX_NAMES = ["ndvi", "ndmi", "ndre", "evi", "gndvi", "msi"]
+RS_OBS_COLS = frozenset(f"{name}_obs" for name in INDEX_NAMES)
 
 
 def merge_weather_ndvi(
@@ -69,7 +72,8 @@ def merge_weather_ndvi(
        backward compatibility). Raw observation values remain in
        ``*_mean`` and ``*_obs`` columns.
     6. Derive rolling features (7-day precipitation, mean temperature, RH).
-    7. Write the merged table to ``MERGED_CSV`` and return its path.
+    7. Write the merged table to ``MERGED_CSV`` (plus a Parquet sidecar when
+       ``pyarrow`` is installed) and return its path.
 
     Parameters
     ----------
@@ -91,8 +95,10 @@ def merge_weather_ndvi(
     w = pd.read_csv(WEATHER_CSV)
     n = pd.read_csv(INDICES_CSV)
 
-    w["date"] = pd.to_datetime(w["date"]).dt.date
-    n["date"] = pd.to_datetime(n["date"]).dt.date
+    # Both raw CSVs are written by our fetchers with ISO dates: take the
+    # ISO8601 fast path and parse each distinct string once.
+    w["date"] = pd.to_datetime(w["date"], format="ISO8601", cache=True).dt.date
+    n["date"] = pd.to_datetime(n["date"], format="ISO8601", cache=True).dt.date
 
     if "cloud_frac" in n.columns:
         cols_to_mask = [
@@ -114,7 +120,7 @@ def merge_weather_ndvi(
     ]
     extra_indices = ["ndmi_mean", "ndre_mean", "evi_mean", "gndvi_mean", "msi_mean"]
     keep = base_cols + extra_indices
-    n = n[[c for c in keep if c in n.columns]].copy()
+    n = n[[c for c in keep if c in n.columns]]
 
     df = pd.merge(w, n, on="date", how="left")
 
@@ -145,14 +151,14 @@ def merge_weather_ndvi(
     if "ndvi_fill" in df.columns:
         df["ndvi_mean_daily"] = df["ndvi_fill"]
 
-    obs_cols = [f"{name}_obs" for name in INDEX_NAMES if f"{name}_obs" in df.columns]
-    if obs_cols:
-        obs_flag = df[obs_cols].notna().any(axis=1)
-    else:
-        obs_flag = pd.Series(False, index=df.index)
+    # OR the per-column presence masks into one flat buffer instead of
+    # materialising a boolean frame.
+    obs_flag = np.zeros(len(df), dtype=bool)
+    for col in RS_OBS_COLS.intersection(df.columns):
+        obs_flag |= df[col].notna().to_numpy()
     df["obs_or_fill"] = obs_flag
     dates = df.index.to_numpy()
-    last_obs_series = pd.Series(dates).where(obs_flag.to_numpy()).ffill()
+    last_obs_series = pd.Series(dates).where(obs_flag).ffill()
     df["last_rs_date"] = pd.to_datetime(last_obs_series).dt.date.to_numpy()
     rs_age = (pd.Series(dates) - last_obs_series).dt.days
     df["rs_age"] = rs_age.fillna(9999).astype(int).to_numpy()
@@ -169,5 +175,6 @@ def merge_weather_ndvi(
 
     DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
     df.to_csv(MERGED_CSV, index=True, encoding="utf-8", float_format="%.4f")
+    write_parquet_sidecar(df.reset_index(), MERGED_CSV)
 
     return MERGED_CSV
@@ -25,11 +25,20 @@ Usage::
 from __future__ import annotations
 
 from pathlib import Path
+import copy
+import functools
 import json
 import logging
+import os
+import pickle
 from datetime import date, datetime
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 ROOT = Path(__file__).resolve().parents[2]
 
 
@@ -47,9 +56,9 @@ def load_config(path: Path | None = None) -> dict:
     dict
         Parsed configuration dictionary with selected paths made absolute.
     """
-    path = path or (ROOT / "config" / "config.yml")
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+    path = Path(path or (ROOT / "config" / "config.yml"))
+    st = os.stat(path)
+    cfg = copy.deepcopy(_load_yaml(str(path), (st.st_mtime_ns, st.st_size)))
     _apply_period_defaults(cfg)
     _validate_region(cfg)
     p = cfg.get("paths", {})
@@ -60,6 +69,41 @@ def load_config(path: Path | None = None) -> dict:
     return cfg
 
 
+def _snapshot_path(path: Path) -> Path:
+    return path.with_name(path.name + ".pkl")
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, stamp: tuple[int, int]) -> dict:
+    """Parse ``path`` once per (path, (mtime_ns, size)) pair.
+
+    A pickled snapshot is kept next to the YAML file together with the stamp
+    of the YAML it was parsed from; it is reused only while the YAML still has
+    that exact stamp, so cold starts skip YAML parsing.
+    Callers must not mutate the returned dict (``load_config`` deep-copies it).
+    """
+    src = Path(path)
+    snapshot = _snapshot_path(src)
+    try:
+        with open(snapshot, "rb") as f:
+            if pickle.load(f) == stamp:
+                return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError) as exc:
+        logging.getLogger(__name__).debug("Ignoring unreadable config snapshot %s: %s", snapshot, exc)
+
+    with open(src, "r", encoding="utf-8") as f:
+        cfg = yaml.load(f, Loader=_YamlLoader)
+    try:
+        with open(snapshot, "wb") as f:
+            pickle.dump(stamp, f, protocol=5)
+            pickle.dump(cfg, f, protocol=5)
+    except OSError as exc:
+        logging.getLogger(__name__).debug("Could not write config snapshot %s: %s", snapshot, exc)
+    return cfg
+
+
 def _parse_date(value: str, field: str) -> date:
     try:
         return datetime.fromisoformat(str(value)).date()
@@ -0,0 +1,133 @@
+"""
+csv_cache.py
+============
+
+Process-wide memo for stage CSVs that several report/plot helpers re-read.
+
+Entries are keyed on the file's mtime and size, so rewriting a CSV
+invalidates its cached frame automatically. Callers get a copy and may mutate
+it freely. Parsed frames are also pickled under ``.cache/`` next to the CSV,
+so a fresh process (e.g. re-running only the plots) skips the text parse as
+long as the CSV has not been rewritten since.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from .io_utils import HAS_PYARROW, empty_csv_frame
+
+CSV_ENGINE = "pyarrow" if HAS_PYARROW else "c"
+
+logger = logging.getLogger(__name__)
+
+
+def _snapshot_path(path: Path, key: tuple) -> Path:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+    return path.parent / ".cache" / f"{path.name}.{digest}.pkl"
+
+
+def file_stamp(path: str | Path) -> tuple[int, int]:
+    """Return the ``(mtime_ns, size)`` pair that identifies a file's contents."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_snapshot(snapshot: Path, stamp: tuple[int, int]) -> pd.DataFrame | None:
+    """Return the pickled frame if it was taken from a file with ``stamp``.
+
+    The stamp is pickled ahead of the frame, so a stale snapshot is rejected
+    without unpickling the frame itself.
+    """
+    try:
+        with open(snapshot, "rb") as f:
+            if pickle.load(f) != stamp:
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError) as exc:
+        logger.debug("Ignoring unreadable CSV snapshot %s: %s", snapshot, exc)
+        return None
+
+
+def _write_snapshot(path: Path, snapshot: Path, stamp: tuple[int, int], df: pd.DataFrame) -> None:
+    """Pickle ``df`` with its source stamp and drop snapshots of older contents."""
+    try:
+        snapshot.parent.mkdir(exist_ok=True)
+        with open(snapshot, "wb") as f:
+            pickle.dump(stamp, f, protocol=5)
+            pickle.dump(df, f, protocol=5)
+    except OSError as exc:
+        logger.debug("Could not write CSV snapshot %s: %s", snapshot, exc)
+        return
+    # Other (parse_dates, usecols, dtype) variants of the same CSV taken before
+    # it was rewritten can never match again; remove them instead of letting
+    # .cache/ grow with every rewrite.
+    for other in snapshot.parent.glob(f"{path.name}.*.pkl"):
+        if other == snapshot:
+            continue
+        try:
+            with open(other, "rb") as f:
+                current = pickle.load(f) == stamp
+        except (OSError, pickle.UnpicklingError, EOFError):
+            current = False
+        if not current:
+            other.unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=32)
+def load_csv(
+    path: str,
+    stamp: tuple[int, int],
+    parse_dates: tuple[str, ...] = (),
+    usecols: tuple[str, ...] | None = None,
+    dtype: tuple[tuple[str, str], ...] = (),
+) -> pd.DataFrame:
+    """Parse ``path`` once per argument set; do not mutate the result.
+
+    ``stamp`` is the file's ``(mtime_ns, size)`` from :func:`file_stamp`.
+    ``usecols`` names the wanted columns; names missing from the file are ignored.
+    ``dtype`` is a tuple of ``(column, dtype)`` pairs so that it stays hashable.
+    Date columns are parsed after the read with the ISO8601 fast path, since
+    every stage CSV is written by this pipeline. A pickled snapshot is reused
+    only while the CSV still has the stamp recorded in it.
+    """
+    src = Path(path)
+    snapshot = _snapshot_path(src, (parse_dates, usecols, dtype))
+    df = _read_snapshot(snapshot, stamp)
+    if df is not None:
+        return df
+
+    df = empty_csv_frame(src, None if usecols is None else list(usecols))
+    if df is not None:
+        return df
+    kwargs = {"dtype": dict(dtype) or None, "engine": CSV_ENGINE}
+    if usecols is not None:
+        # The pyarrow engine only accepts a list of existing names, not a callable.
+        header = pd.read_csv(path, nrows=0).columns
+        kwargs["usecols"] = [c for c in usecols if c in header]
+    df = pd.read_csv(path, **kwargs)
+    for col in parse_dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="ISO8601", cache=True)
+    _write_snapshot(src, snapshot, stamp, df)
+    return df
+
+
+def read_csv_cached(
+    path: Path,
+    parse_dates: tuple[str, ...] = (),
+    usecols: tuple[str, ...] | None = None,
+    dtype: tuple[tuple[str, str], ...] = (),
+) -> pd.DataFrame:
+    """Return a private copy of the cached frame for ``path``."""
+    path = str(path)
+    return load_csv(path, file_stamp(path), parse_dates, usecols, dtype).copy()
@@ -0,0 +1,133 @@
+"""
+io_utils.py
+===========
+
+Helpers for the columnar (Parquet) sidecars written next to stage CSVs.
+
+The CSV files stay the canonical, human-readable outputs. When ``pyarrow`` is
+installed, writers additionally drop ``<name>.parquet`` beside the CSV so that
+readers which only need a few columns (e.g. stage summaries) can prune columns
+instead of re-tokenising the whole text file. A sidecar is only trusted while
+it is at least as new as its CSV. ``read_date_range`` additionally pushes a
+date-window filter into the Arrow scanner for either format.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+HAS_PYARROW = pq is not None
+
+# Stage CSVs at or below this size are peeked at for a header-only table
+# before the full parser is started.
+SMALL_CSV_BYTES = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def parquet_sidecar(csv_path: Path) -> Path:
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def write_parquet_sidecar(df: pd.DataFrame, csv_path: Path) -> Path | None:
+    """Write ``df`` to the Parquet sidecar of ``csv_path`` (no-op without pyarrow)."""
+    if not HAS_PYARROW:
+        return None
+    out = parquet_sidecar(csv_path)
+    try:
+        df.to_parquet(out, index=False, compression="zstd")
+    except Exception as exc:
+        logger.warning("Parquet sidecar skipped for %s: %s", out.name, exc)
+        out.unlink(missing_ok=True)
+        return None
+    return out
+
+
+def fresh_parquet_sidecar(csv_path: Path) -> Path | None:
+    """Return the sidecar path if it exists and is not older than the CSV."""
+    if not HAS_PYARROW:
+        return None
+    csv_path = Path(csv_path)
+    out = parquet_sidecar(csv_path)
+    try:
+        sidecar_mtime = out.stat().st_mtime_ns
+    except OSError:
+        return None
+    if csv_path.exists() and csv_path.stat().st_mtime_ns > sidecar_mtime:
+        return None
+    return out
+
+
+def empty_csv_frame(csv_path: Path, columns: list[str] | None = None) -> pd.DataFrame | None:
+    """Return an empty frame for a CSV without data rows, else ``None``.
+
+    Stages with nothing to report write header-only (or blank) CSVs; those
+    need no parser start-up. Larger files cost a single ``stat``.
+    """
+    csv_path = Path(csv_path)
+    if csv_path.stat().st_size > SMALL_CSV_BYTES:
+        return None
+    lines = [line for line in csv_path.read_text(encoding="utf-8-sig").splitlines() if line.strip()]
+    if len(lines) > 1:
+        return None
+    header = lines[0].split(",") if lines else []
+    if columns is not None:
+        header = [c for c in header if c in columns]
+    return pd.DataFrame(columns=header)
+
+
+def read_parquet_columns(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read ``columns`` (those present in the file) from a Parquet file."""
+    if columns is not None:
+        names = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in names]
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+def read_date_range(
+    path: Path,
+    date_col: str,
+    start: date,
+    end: date,
+    columns: list[str] | None = None,
+    file_format: str = "csv",
+) -> pd.DataFrame:
+    """Read rows with ``start <= date_col <= end`` (inclusive) from a CSV/Parquet file.
+
+    The date predicate and column projection are pushed into the Arrow scanner,
+    so rows outside the range are never converted to pandas. Files without
+    ``date_col`` are returned unfiltered.
+    """
+    fmt = file_format
+    if file_format == "csv":
+        fmt = pads.CsvFileFormat(
+            convert_options=pacsv.ConvertOptions(column_types={date_col: pa.timestamp("s")})
+        )
+    dataset = pads.dataset(str(path), format=fmt)
+    names = dataset.schema.names
+    if columns is not None:
+        columns = [c for c in columns if c in names]
+    if date_col not in names:
+        return dataset.to_table(columns=columns).to_pandas()
+
+    dtype = dataset.schema.field(date_col).type
+    if pa.types.is_timestamp(dtype):
+        lo = pa.scalar(datetime.combine(start, time.min), type=dtype)
+        hi = pa.scalar(datetime.combine(end, time.min), type=dtype)
+    else:
+        lo = pa.scalar(start, type=dtype)
+        hi = pa.scalar(end, type=dtype)
+    predicate = (pads.field(date_col) >= lo) & (pads.field(date_col) <= hi)
+    return dataset.to_table(columns=columns, filter=predicate).to_pandas()
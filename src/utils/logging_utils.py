@@ -78,6 +78,7 @@ def setup_logging(
     if reset and logger.handlers:
         for handler in list(logger.handlers):
             logger.removeHandler(handler)
+            handler.close()
 
     level_name = str(level).upper()
     level_value = getattr(logging, level_name, logging.INFO)
@@ -0,0 +1,69 @@
+"""
+report_utils.py
+===============
+
+Pieces shared by the stage-summary, plot and report scripts: the event-type
+display labels, the stage summary location and the report-range filter.
+
+pandas is only imported inside the functions that need it, so ``make_report``
+keeps its cheap start-up when it has no tables to read.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+from typing import TYPE_CHECKING
+
+from .config_loader import MERGED_CSV, PERIOD_REPORT_END, PERIOD_REPORT_START
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+STAGE_SUMMARY_JSON = MERGED_CSV.parent / "stage_summary.json"
+
+EVENT_LABELS = {
+    "drought": "\u5e72\u65f1",
+    "waterlogging": "\u6c34\u6d9d",
+    "heat_stress": "\u70ed\u80c1\u8feb",
+    "cold_stress": "\u51b7\u80c1\u8feb",
+    "nutrient_or_pest": "\u8425\u517b/\u75c5\u866b\u7591\u4f3c\u4fe1\u53f7",
+    "composite": "\u590d\u5408\u4e8b\u4ef6",
+}
+
+
+def load_stage_summary() -> dict | None:
+    """Parsed ``stage_summary.json``, or ``None`` if it has not been built."""
+    if STAGE_SUMMARY_JSON.exists():
+        return json.loads(STAGE_SUMMARY_JSON.read_text(encoding="utf-8"))
+    return None
+
+
+@functools.cache
+def _report_bounds():
+    """Report range as a ``datetime64[ns]`` pair, converted once per process."""
+    import numpy as np
+
+    return np.datetime64(PERIOD_REPORT_START, "ns"), np.datetime64(PERIOD_REPORT_END, "ns")
+
+
+def filter_by_report_range(df: pd.DataFrame | None, date_col: str) -> pd.DataFrame | None:
+    """Rows of ``df`` whose ``date_col`` lies in the report range (inclusive).
+
+    Text dates are parsed as ISO8601 on the fly (unparseable ones drop out).
+    Sorted stage tables are sliced with two binary searches instead of a mask.
+    """
+    if df is None or df.empty or date_col not in df.columns:
+        return df
+    import pandas as pd
+
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, format="ISO8601", cache=True, errors="coerce")
+    start, end = _report_bounds()
+    values = dates.to_numpy()
+    if dates.is_monotonic_increasing:
+        lo = values.searchsorted(start, side="left")
+        hi = values.searchsorted(end, side="right")
+        return df.iloc[lo:hi]
+    return df[(values >= start) & (values <= end)]
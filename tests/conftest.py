@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Value ranges that straddle every composite-alert rule threshold.
+DAILY_RANGES = {
+    "ndvi_fill": (0.0, 1.0),
+    "evi_fill": (0.0, 0.8),
+    "ndmi_fill": (-0.2, 0.7),
+    "msi_fill": (0.5, 2.5),
+    "ndre_fill": (0.0, 0.6),
+    "gndvi_fill": (0.2, 0.8),
+    "precip_7d": (0.0, 120.0),
+    "tmean_7d": (-5.0, 40.0),
+    "rh_7d": (20.0, 100.0),
+    "tmin_7d": (-10.0, 30.0),
+    "ndvi_slope7": (-0.1, 0.1),
+}
+
+
+def _daily(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"date": pd.date_range("2023-01-01", periods=n, freq="D")})
+    for col, (lo, hi) in DAILY_RANGES.items():
+        values = rng.uniform(lo, hi, n)
+        values[rng.random(n) < 0.1] = np.nan
+        df[col] = values
+    df["qc_ok"] = rng.random(n) < 0.8
+    df["gating_ok"] = rng.random(n) < 0.6
+    return df
+
+
+@pytest.fixture
+def daily():
+    """Factory for synthetic daily rule inputs: ``daily(n, seed=0)``."""
+    return _daily
@@ -0,0 +1,127 @@
+"""Column-wise alert classification and event merging in composite_alerts."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import composite_alerts as ca
+
+
+def _classify_row_reference(row: pd.Series, apply_gating: bool) -> tuple[str | None, str]:
+    """The original per-row classifier that ``_classify`` replaced."""
+    if not row.get("qc_ok", False):
+        return None, ""
+    if apply_gating and not row.get("gating_ok", False):
+        return None, ""
+
+    ndvi = row.get("ndvi_fill", np.nan)
+    evi = row.get("evi_fill", np.nan)
+    ndmi = row.get("ndmi_fill", np.nan)
+    msi = row.get("msi_fill", np.nan)
+    ndre = row.get("ndre_fill", np.nan)
+    gnd = row.get("gndvi_fill", np.nan)
+    p7 = row.get("precip_7d", np.nan)
+    t7 = row.get("tmean_7d", np.nan)
+    rh7 = row.get("rh_7d", np.nan)
+    tmin7 = row.get("tmin_7d", np.nan)
+    slope7 = row.get("ndvi_slope7", np.nan)
+    canopy = (pd.notna(ndvi) and ndvi >= ca.NDVI_CROP) or (pd.notna(evi) and evi >= ca.EVI_CROP)
+    finite = ca._finite_row
+
+    trig = []
+    if canopy and finite(row, "ndmi_fill", "msi_fill", "precip_7d"):
+        if (ndmi < ca.NDMI_DRY or msi > ca.MSI_DRY) and (p7 < ca.PRECIP_LOW7):
+            trig.append(("drought", f"NDMI={ndmi:.3f}/MSI={msi:.3f}; precip_7d={p7:.1f}"))
+    if canopy and finite(row, "ndmi_fill", "precip_7d", "evi_fill", "ndvi_fill"):
+        if (ndmi > ca.NDMI_WET) and (p7 > ca.PRECIP_HIGH7) and ((evi < ca.EVI_CROP) or (ndvi < ca.NDVI_CROP)):
+            trig.append(
+                ("waterlogging", f"NDMI={ndmi:.3f}; precip_7d={p7:.1f}; EVI={evi:.3f}, NDVI={ndvi:.3f}")
+            )
+    if canopy and finite(row, "tmean_7d", "rh_7d", "evi_fill", "ndvi_slope7"):
+        if (t7 >= ca.HEAT_TMEAN7) and (rh7 <= ca.HEAT_RH7) and ((evi < ca.EVI_CROP) or (slope7 <= ca.SLOPE7_DROP)):
+            trig.append(
+                ("heat_stress", f"tmean_7d={t7:.1f}C, RH7={rh7:.0f}%, slope7={slope7:.3f}, EVI={evi:.3f}")
+            )
+    if canopy and finite(row, "tmin_7d", "evi_fill", "ndvi_fill", "ndvi_slope7"):
+        if (tmin7 <= ca.COLD_TMIN7) and ((evi < 0.40) or (ndvi < 0.50) or (slope7 <= ca.SLOPE7_DROP)):
+            trig.append(
+                ("cold_stress", f"tmin_7d={tmin7:.1f}?C, EVI={evi:.3f}, NDVI={ndvi:.3f}, slope7={slope7:.3f}")
+            )
+    if canopy and finite(row, "ndre_fill", "gndvi_fill", "ndmi_fill"):
+        if ((ndre < ca.NDRE_LOW) or (gnd < ca.GNDVI_LOW)) and (ndmi >= ca.NDMI_DRY):
+            trig.append(("nutrient_or_pest", f"NDRE={ndre:.3f}, GNDVI={gnd:.3f}, NDMI={ndmi:.3f}"))
+
+    if not trig:
+        return None, ""
+    if len(trig) >= 2:
+        return "composite", " + ".join(k for k, _ in trig)
+    return trig[0]
+
+
+@pytest.mark.parametrize("apply_gating", [False, True])
+def test_classify_matches_row_classifier(daily, apply_gating):
+    df = daily(3000, seed=2)
+    rows = []
+    for _, r in df.iterrows():
+        et, reason = _classify_row_reference(r, apply_gating)
+        if et:
+            rows.append({"date": r["date"], "event_type": et, "reason": reason})
+    expected = pd.DataFrame(rows)
+    assert set(expected["event_type"]) >= {"composite", "drought", "nutrient_or_pest"}
+
+    got = ca._classify(df, apply_gating)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_classify_without_hits_is_empty(daily):
+    df = daily(50)
+    df["qc_ok"] = False
+    assert ca._classify(df, apply_gating=False).empty
+
+
+def _alerts(days: list[int], event_type: str = "drought") -> pd.DataFrame:
+    dates = pd.Timestamp("2024-06-01") + pd.to_timedelta(days, unit="D")
+    return pd.DataFrame({"date": dates, "event_type": event_type, "reason": "r"})
+
+
+@pytest.mark.parametrize(
+    ("gap_days", "expected"),
+    [
+        # Alert days 0, 1, 3 and 9: gaps of 1, 2 and 6 days between them.
+        (0, [("2024-06-01", "2024-06-02"), ("2024-06-04", "2024-06-04"), ("2024-06-10", "2024-06-10")]),
+        (1, [("2024-06-01", "2024-06-04"), ("2024-06-10", "2024-06-10")]),
+        (5, [("2024-06-01", "2024-06-10")]),
+    ],
+)
+def test_merge_events_respects_gap(monkeypatch, gap_days, expected):
+    monkeypatch.setattr(ca, "MERGE_GAP_DAYS", gap_days)
+    alerts = _alerts([0, 1, 3, 9])
+    daily = pd.DataFrame({"date": pd.date_range("2024-06-01", periods=10, freq="D")})
+    daily["ndmi_fill"] = np.linspace(0.15, 0.05, 10)
+    daily["precip_7d"] = 1.0
+
+    events = ca._merge_events(alerts, daily)
+
+    assert list(zip(events["start_date"], events["end_date"])) == expected
+    durations = [(pd.Timestamp(e) - pd.Timestamp(s)).days + 1 for s, e in expected]
+    assert events["duration_days"].tolist() == durations
+    # Drought intensity grows as NDMI falls, so each event peaks on its last day.
+    assert events["peak_date"].tolist() == [e for _, e in expected]
+
+
+def test_merge_events_keeps_types_apart():
+    alerts = pd.concat([_alerts([0, 1]), _alerts([1, 2], "heat_stress")]).sort_values("date")
+    daily = pd.DataFrame({"date": pd.date_range("2024-06-01", periods=3, freq="D"), "tmean_7d": 30.0})
+
+    events = ca._merge_events(alerts, daily)
+
+    assert events[["event_type", "start_date", "end_date"]].values.tolist() == [
+        ["drought", "2024-06-01", "2024-06-02"],
+        ["heat_stress", "2024-06-02", "2024-06-03"],
+    ]
+
+
+def test_merge_events_empty():
+    events = ca._merge_events(pd.DataFrame(), pd.DataFrame())
+    assert events.empty
+    assert "start_date" in events.columns
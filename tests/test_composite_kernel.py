@@ -0,0 +1,36 @@
+"""The optional numba trigger kernel must agree with the NumPy masks."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import composite_alerts as ca
+from src.analysis._composite_kernel import HAS_NUMBA, THRESHOLD_NAMES, trigger_bits
+
+pytestmark = pytest.mark.skipif(not HAS_NUMBA, reason="numba is not installed")
+
+def test_threshold_order_matches_kernel():
+    assert len(ca.KERNEL_THRESHOLDS) == len(THRESHOLD_NAMES)
+    for name, value in zip(THRESHOLD_NAMES, ca.KERNEL_THRESHOLDS):
+        assert getattr(ca, name.upper()) == value
+
+
+def test_kernel_bits_match_trigger_matrix(daily):
+    df = daily(5000)
+    v = {c: ca._float_col(df, c) for c in ca.CLASSIFY_INPUT_COLUMNS}
+    eligible = df["qc_ok"].to_numpy()
+
+    bits = trigger_bits()(*(v[c] for c in ca.CLASSIFY_INPUT_COLUMNS), eligible, ca.KERNEL_THRESHOLDS)
+    trig = ((bits[:, None] >> np.arange(len(ca.EVENT_REASONS))) & 1).astype(bool)
+
+    expected = ca._trigger_matrix(v, eligible)
+    assert expected.any(axis=0).all(), "every rule should fire on the synthetic data"
+    np.testing.assert_array_equal(trig, expected)
+
+
+@pytest.mark.parametrize("apply_gating", [False, True])
+def test_classify_same_with_kernel(monkeypatch, daily, apply_gating):
+    df = daily(2000, seed=1)
+    expected = ca._classify(df, apply_gating)
+    monkeypatch.setattr(ca, "KERNEL_MIN_ROWS", 0)
+    pd.testing.assert_frame_equal(ca._classify(df, apply_gating), expected)
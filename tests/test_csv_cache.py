@@ -0,0 +1,84 @@
+"""Snapshot reuse and invalidation in src.utils.csv_cache."""
+
+import os
+
+import pytest
+
+from src.utils import csv_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memo():
+    csv_cache.load_csv.cache_clear()
+    yield
+    csv_cache.load_csv.cache_clear()
+
+
+def _rewrite(path, text, keep_mtime):
+    st = os.stat(path)
+    path.write_text(text)
+    if keep_mtime:
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_snapshot_reused_across_processes(tmp_path, monkeypatch):
+    path = tmp_path / "a.csv"
+    path.write_text("date,x\n2024-01-01,1\n")
+    first = csv_cache.read_csv_cached(path, ("date",))
+    csv_cache.load_csv.cache_clear()
+
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("CSV parsed again despite a current snapshot")
+
+    monkeypatch.setattr(csv_cache.pd, "read_csv", _no_parse)
+    again = csv_cache.read_csv_cached(path, ("date",))
+    assert again.equals(first)
+    assert str(again["date"].dtype).startswith("datetime64")
+
+
+@pytest.mark.parametrize("keep_mtime", [False, True])
+def test_rewrite_invalidates_snapshot(tmp_path, keep_mtime):
+    path = tmp_path / "a.csv"
+    path.write_text("date,x\n2024-01-01,1\n")
+    assert csv_cache.read_csv_cached(path)["x"].tolist() == [1]
+
+    # A different size is detected even when the mtime is restored.
+    _rewrite(path, "date,x\n2024-01-01,22\n", keep_mtime)
+    csv_cache.load_csv.cache_clear()
+    assert csv_cache.read_csv_cached(path)["x"].tolist() == [22]
+
+
+def test_older_mtime_invalidates_snapshot(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("date,x\n2024-01-01,1\n")
+    csv_cache.read_csv_cached(path)
+
+    # Same size, but restored with an older mtime than the snapshot.
+    st = os.stat(path)
+    path.write_text("date,x\n2024-01-01,2\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+    csv_cache.load_csv.cache_clear()
+    assert csv_cache.read_csv_cached(path)["x"].tolist() == [2]
+
+
+def test_stale_variants_are_pruned(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("date,x,y\n2024-01-01,1,2\n")
+    csv_cache.read_csv_cached(path, ("date",))
+    csv_cache.read_csv_cached(path, (), ("x",))
+    assert len(list((tmp_path / ".cache").glob("a.csv.*.pkl"))) == 2
+
+    _rewrite(path, "date,x,y\n2024-01-01,10,20\n", keep_mtime=False)
+    csv_cache.read_csv_cached(path, ("date",))
+    assert len(list((tmp_path / ".cache").glob("a.csv.*.pkl"))) == 1
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("date,x\n2024-01-01,1\n")
+    csv_cache.read_csv_cached(path)
+    (snapshot,) = (tmp_path / ".cache").glob("a.csv.*.pkl")
+    snapshot.write_bytes(b"not a pickle")
+
+    csv_cache.load_csv.cache_clear()
+    assert csv_cache.read_csv_cached(path)["x"].tolist() == [1]
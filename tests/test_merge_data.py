@@ -0,0 +1,67 @@
+"""Trailing 7-day weather windows written by merge_weather_ndvi."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.transform import merge_data as md
+
+
+def _trailing(values: np.ndarray, reduce) -> np.ndarray:
+    """Reference window: the current day and up to six before it, NaNs skipped."""
+    out = np.full(len(values), np.nan)
+    for i in range(len(values)):
+        window = values[max(0, i - 6) : i + 1]
+        window = window[~np.isnan(window)]
+        if len(window):
+            out[i] = reduce(window)
+    return out
+
+
+@pytest.fixture
+def merged(tmp_path, monkeypatch):
+    rng = np.random.default_rng(3)
+    n = 40
+    dates = pd.date_range("2024-03-01", periods=n, freq="D")
+    weather = pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "temperature_2m_max": rng.uniform(10, 30, n).round(3),
+            "temperature_2m_min": rng.uniform(-5, 10, n).round(3),
+            "precipitation_sum": rng.uniform(0, 20, n).round(3),
+            "relative_humidity_2m_mean": rng.uniform(30, 95, n).round(0),
+        }
+    )
+    weather.loc[[5, 17, 18], "precipitation_sum"] = np.nan
+    indices = pd.DataFrame({"date": dates[::5].strftime("%Y-%m-%d"), "ndvi_mean": rng.uniform(0.2, 0.8, 8)})
+
+    weather_csv = tmp_path / "weather.csv"
+    indices_csv = tmp_path / "indices.csv"
+    weather.to_csv(weather_csv, index=False)
+    indices.to_csv(indices_csv, index=False)
+    monkeypatch.setattr(md, "WEATHER_CSV", weather_csv)
+    monkeypatch.setattr(md, "INDICES_CSV", indices_csv)
+    monkeypatch.setattr(md, "DATA_PROCESSED", tmp_path)
+    monkeypatch.setattr(md, "MERGED_CSV", tmp_path / "01_merged.csv")
+
+    out = md.merge_weather_ndvi()
+    return weather, pd.read_csv(out)
+
+
+def test_seven_day_windows(merged):
+    weather, df = merged
+    tmean = (weather["temperature_2m_max"] + weather["temperature_2m_min"]).to_numpy() / 2.0
+
+    expected = {
+        "precip_7d": _trailing(weather["precipitation_sum"].to_numpy(), np.sum),
+        "tmean_7d": _trailing(tmean, np.mean),
+        "rh_7d": _trailing(weather["relative_humidity_2m_mean"].to_numpy(), np.mean),
+    }
+    for col, values in expected.items():
+        np.testing.assert_allclose(df[col].to_numpy(), values, atol=1e-4, err_msg=col)
+
+
+def test_rs_age_counts_days_since_observation(merged):
+    _, df = merged
+    # Indices land every fifth day starting on the first.
+    assert df["rs_age"].tolist() == [i % 5 for i in range(len(df))]
@@ -0,0 +1,53 @@
+"""Report-range filtering shared by the summary, plot and report scripts."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import report_utils
+
+START, END = "2024-04-01", "2024-09-30"
+
+
+@pytest.fixture(autouse=True)
+def _report_range(monkeypatch):
+    bounds = (np.datetime64(START, "ns"), np.datetime64(END, "ns"))
+    monkeypatch.setattr(report_utils, "_report_bounds", lambda: bounds)
+
+
+def _expected(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    dates = pd.to_datetime(df[col], errors="coerce")
+    return df[(dates >= START) & (dates <= END)]
+
+
+def _frame(dates) -> pd.DataFrame:
+    return pd.DataFrame({"date": dates, "value": range(len(dates))})
+
+
+def test_sorted_dates_sliced_inclusively():
+    df = _frame(pd.date_range("2024-01-01", "2024-12-31", freq="D"))
+    out = report_utils.filter_by_report_range(df, "date")
+    pd.testing.assert_frame_equal(out, _expected(df, "date"))
+    assert out["date"].iloc[0] == pd.Timestamp(START)
+    assert out["date"].iloc[-1] == pd.Timestamp(END)
+
+
+def test_unsorted_and_repeated_dates():
+    dates = pd.to_datetime(["2024-10-01", "2024-04-01", "2024-03-31", "2024-09-30", "2024-06-15", "2024-06-15"])
+    df = _frame(dates)
+    out = report_utils.filter_by_report_range(df, "date")
+    pd.testing.assert_frame_equal(out, _expected(df, "date"))
+    assert out["value"].tolist() == [1, 3, 4, 5]
+
+
+def test_text_dates_are_parsed():
+    df = _frame(["2024-03-31", "2024-04-01", "not a date", "2024-09-30T00:00:00", "2024-10-01"])
+    out = report_utils.filter_by_report_range(df, "date")
+    assert out["value"].tolist() == [1, 3]
+    # The caller's column is left as text.
+    assert out["date"].tolist() == ["2024-04-01", "2024-09-30T00:00:00"]
+
+
+@pytest.mark.parametrize("df", [None, pd.DataFrame(), pd.DataFrame({"other": [1]})])
+def test_missing_input_passes_through(df):
+    assert report_utils.filter_by_report_range(df, "date") is df